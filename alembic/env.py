@@ -4,9 +4,11 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from app.core.config import settings
 # Import Base và models
-from app.db.base import Base
+from app.db.base import Base, SQLALCHEMY_DATABASE_URL
+import app.models.document  # noqa: F401
+import app.models.page  # noqa: F401
+import app.models.ingestion_job  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
@@ -16,7 +18,7 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Thêm URL database từ settings
-config.set_main_option('sqlalchemy.url', f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOSTNAME}:{settings.DATABASE_PORT}/{settings.POSTGRES_DB}")
+config.set_main_option('sqlalchemy.url', SQLALCHEMY_DATABASE_URL)
 
 # Set target metadata
 target_metadata = Base.metadata
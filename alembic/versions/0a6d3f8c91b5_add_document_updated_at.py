@@ -0,0 +1,27 @@
+"""Add document updated_at
+
+Revision ID: 0a6d3f8c91b5
+Revises: f52b9d7e0a14
+Create Date: 2026-10-19 13:48:09.116542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d3f8c91b5'
+down_revision: Union[str, None] = 'f52b9d7e0a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE documents SET updated_at = COALESCE(extraction_time, CURRENT_TIMESTAMP)')
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'updated_at')
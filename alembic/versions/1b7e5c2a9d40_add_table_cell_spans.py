@@ -0,0 +1,28 @@
+"""Add table cell spans
+
+Revision ID: 1b7e5c2a9d40
+Revises: 0a6d3f8c91b5
+Create Date: 2026-10-19 14:37:22.540918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e5c2a9d40'
+down_revision: Union[str, None] = '0a6d3f8c91b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('table_cells', sa.Column('row_span', sa.Integer(), nullable=True, server_default='1'))
+    op.add_column('table_cells', sa.Column('col_span', sa.Integer(), nullable=True, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('table_cells', 'col_span')
+    op.drop_column('table_cells', 'row_span')
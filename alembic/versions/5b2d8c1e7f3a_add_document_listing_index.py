@@ -0,0 +1,27 @@
+"""Add document listing index
+
+Revision ID: 5b2d8c1e7f3a
+Revises: 329098f248b7
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2d8c1e7f3a'
+down_revision: Union[str, None] = '329098f248b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Phân trang keyset theo id khi lọc theo loại văn bản
+    op.create_index('ix_documents_document_type_id', 'documents', ['document_type', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_document_type_id', table_name='documents')
@@ -0,0 +1,42 @@
+"""Add document search indexes
+
+Revision ID: 8e4a6f0c2d91
+Revises: 5b2d8c1e7f3a
+Create Date: 2026-10-19 10:03:17.582930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a6f0c2d91'
+down_revision: Union[str, None] = '5b2d8c1e7f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Tra cứu chính xác theo số văn bản; INCLUDE id để lấy id bằng index-only scan
+    op.create_index('ix_documents_document_number', 'documents', ['document_number'],
+                    unique=False, postgresql_include=['id'])
+    # Lọc theo khoảng ngày ban hành kết hợp phân trang theo id
+    op.create_index('ix_documents_issue_date_id', 'documents', ['issue_date', 'id'], unique=False)
+    # Tìm gần đúng (ILIKE '%...%') theo cơ quan ban hành và người ký
+    op.create_index('ix_documents_issuing_agency_trgm', 'documents', ['issuing_agency'],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={'issuing_agency': 'gin_trgm_ops'})
+    op.create_index('ix_documents_signer_trgm', 'documents', ['signer'],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={'signer': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_signer_trgm', table_name='documents')
+    op.drop_index('ix_documents_issuing_agency_trgm', table_name='documents')
+    op.drop_index('ix_documents_issue_date_id', table_name='documents')
+    op.drop_index('ix_documents_document_number', table_name='documents')
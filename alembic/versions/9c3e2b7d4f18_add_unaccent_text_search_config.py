@@ -0,0 +1,33 @@
+"""Add unaccent text search config
+
+Revision ID: 9c3e2b7d4f18
+Revises: 1b7e5c2a9d40
+Create Date: 2026-10-19 16:05:41.218730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3e2b7d4f18'
+down_revision: Union[str, None] = '1b7e5c2a9d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Giống 'simple' nhưng bỏ dấu từng từ trước khi so: ts_headline dùng cấu hình này để
+    # khớp truy vấn đã bỏ dấu với nội dung gốc có dấu (nội dung trả về vẫn giữ dấu)
+    op.execute('CREATE TEXT SEARCH CONFIGURATION simple_unaccent (COPY = simple)')
+    op.execute("""
+        ALTER TEXT SEARCH CONFIGURATION simple_unaccent
+            ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part
+            WITH unaccent, simple
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TEXT SEARCH CONFIGURATION IF EXISTS simple_unaccent')
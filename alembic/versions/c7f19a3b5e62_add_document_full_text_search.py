@@ -0,0 +1,43 @@
+"""Add document full text search
+
+Revision ID: c7f19a3b5e62
+Revises: 8e4a6f0c2d91
+Create Date: 2026-10-19 11:26:05.310472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f19a3b5e62'
+down_revision: Union[str, None] = '8e4a6f0c2d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    # unaccent() không IMMUTABLE nên không dùng được trong cột generated/index, cần hàm bọc
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text AS $$
+            SELECT public.unaccent('public.unaccent', $1)
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """)
+    # Trích yếu có trọng số cao hơn nội dung khi xếp hạng
+    op.execute("""
+        ALTER TABLE documents ADD COLUMN content_tsv tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', f_unaccent(coalesce(subject, ''))), 'A') ||
+            setweight(to_tsvector('simple', f_unaccent(coalesce(content, ''))), 'B')
+        ) STORED
+    """)
+    op.create_index('ix_documents_content_tsv', 'documents', ['content_tsv'],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_content_tsv', table_name='documents')
+    op.drop_column('documents', 'content_tsv')
+    op.execute('DROP FUNCTION IF EXISTS f_unaccent(text)')
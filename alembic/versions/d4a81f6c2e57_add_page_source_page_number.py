@@ -0,0 +1,54 @@
+"""Add page source page number
+
+Revision ID: d4a81f6c2e57
+Revises: 9c3e2b7d4f18
+Create Date: 2026-10-19 17:12:08.664105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a81f6c2e57'
+down_revision: Union[str, None] = '9c3e2b7d4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('pages', sa.Column('source_page_number', sa.Integer(), nullable=True))
+    op.alter_column('pages', 'page_number', existing_type=sa.Integer(), nullable=True)
+
+    # Dữ liệu cũ không lưu số trang trong file đầu vào; trang được ghi theo thứ tự của file
+    # nên thứ tự id trong job là thứ tự trang
+    op.execute("""
+        UPDATE pages SET source_page_number = (
+            SELECT COUNT(*) FROM pages AS p2 WHERE p2.job_id = pages.job_id AND p2.id <= pages.id
+        )
+    """)
+    # Trang trống giữ số gốc nên trùng với trang có nội dung được đánh số lại (nằm sau nó trong file):
+    # giữ trang ghi sau, bỏ số trang và liên kết văn bản của các trang còn lại
+    op.execute("""
+        UPDATE pages SET page_number = NULL, document_id = NULL
+        WHERE EXISTS (
+            SELECT 1 FROM pages AS p2
+            WHERE p2.job_id = pages.job_id AND p2.page_number = pages.page_number AND p2.id > pages.id
+        )
+    """)
+    op.alter_column('pages', 'source_page_number', existing_type=sa.Integer(), nullable=False)
+
+    op.drop_index('ix_pages_job_id_page_number', table_name='pages')
+    op.create_unique_constraint('uq_pages_job_id_source_page_number', 'pages', ['job_id', 'source_page_number'])
+    op.create_unique_constraint('uq_pages_job_id_page_number', 'pages', ['job_id', 'page_number'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_pages_job_id_page_number', 'pages', type_='unique')
+    op.drop_constraint('uq_pages_job_id_source_page_number', 'pages', type_='unique')
+    op.create_index('ix_pages_job_id_page_number', 'pages', ['job_id', 'page_number'], unique=False)
+    op.execute('UPDATE pages SET page_number = source_page_number WHERE page_number IS NULL')
+    op.alter_column('pages', 'page_number', existing_type=sa.Integer(), nullable=False)
+    op.drop_column('pages', 'source_page_number')
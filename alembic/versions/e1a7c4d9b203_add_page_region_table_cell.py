@@ -0,0 +1,113 @@
+"""Add page region table cell
+
+Revision ID: e1a7c4d9b203
+Revises: c7f19a3b5e62
+Create Date: 2026-10-19 12:14:48.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c4d9b203'
+down_revision: Union[str, None] = 'c7f19a3b5e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('job_id', sa.String(length=200), nullable=True))
+    op.create_index(op.f('ix_documents_job_id'), 'documents', ['job_id'], unique=False)
+
+    # Bảng pages cũ (sao chép metadata của văn bản) chưa từng được ghi dữ liệu, tạo lại theo dạng chuẩn hóa
+    op.drop_index('ix_pages_id', table_name='pages')
+    op.drop_table('pages')
+    op.create_table('pages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('job_id', sa.String(length=200), nullable=False),
+    sa.Column('page_number', sa.Integer(), nullable=False),
+    sa.Column('extraction_time', sa.DateTime(), nullable=True),
+    sa.Column('version', sa.String(length=50), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('ocr_text', sa.Text(), nullable=True),
+    sa.Column('extracted_info', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pages_id'), 'pages', ['id'], unique=False)
+    op.create_index('ix_pages_job_id_page_number', 'pages', ['job_id', 'page_number'], unique=False)
+    op.create_index('ix_pages_document_id_page_number', 'pages', ['document_id', 'page_number'], unique=False)
+
+    op.create_table('regions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('page_id', sa.Integer(), nullable=False),
+    sa.Column('region_index', sa.Integer(), nullable=False),
+    sa.Column('x', sa.Integer(), nullable=True),
+    sa.Column('y', sa.Integer(), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['page_id'], ['pages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_regions_page_id'), 'regions', ['page_id'], unique=False)
+
+    op.create_table('table_cells',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('page_id', sa.Integer(), nullable=False),
+    sa.Column('table_index', sa.Integer(), nullable=False),
+    sa.Column('row', sa.Integer(), nullable=False),
+    sa.Column('col', sa.Integer(), nullable=False),
+    sa.Column('x', sa.Integer(), nullable=True),
+    sa.Column('y', sa.Integer(), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('text', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['page_id'], ['pages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_table_cells_page_id'), 'table_cells', ['page_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_table_cells_page_id'), table_name='table_cells')
+    op.drop_table('table_cells')
+    op.drop_index(op.f('ix_regions_page_id'), table_name='regions')
+    op.drop_table('regions')
+    op.drop_index('ix_pages_document_id_page_number', table_name='pages')
+    op.drop_index('ix_pages_job_id_page_number', table_name='pages')
+    op.drop_index(op.f('ix_pages_id'), table_name='pages')
+    op.drop_table('pages')
+    op.create_table('pages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.Column('extraction_time', sa.DateTime(), nullable=True),
+    sa.Column('version', sa.String(length=50), nullable=True),
+    sa.Column('text_regions', sa.JSON(), nullable=True),
+    sa.Column('tables', sa.JSON(), nullable=True),
+    sa.Column('ocr_text', sa.String(), nullable=True),
+    sa.Column('image_path', sa.String(), nullable=True),
+    sa.Column('document_type', sa.String(length=100), nullable=True),
+    sa.Column('document_number', sa.String(length=100), nullable=True),
+    sa.Column('issue_location', sa.String(length=200), nullable=True),
+    sa.Column('issue_date', sa.String(length=50), nullable=True),
+    sa.Column('issuing_agency', sa.String(length=200), nullable=True),
+    sa.Column('recipients', sa.String(length=500), nullable=True),
+    sa.Column('recipient_address', sa.String(length=500), nullable=True),
+    sa.Column('signer', sa.String(length=200), nullable=True),
+    sa.Column('position', sa.String(length=200), nullable=True),
+    sa.Column('subject', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pages_id'), 'pages', ['id'], unique=False)
+    op.drop_index(op.f('ix_documents_job_id'), table_name='documents')
+    op.drop_column('documents', 'job_id')
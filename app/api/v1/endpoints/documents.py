@@ -1,66 +1,271 @@
-from typing import Dict, List
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Header, UploadFile, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.db.base import get_db
+from app.db.base import AsyncSessionLocal, get_async_db
 from app.services.document_service import DocumentService
+from app.services.ingestion_service import IngestionService
 from app.services.ocr_service import OCRService
-from app.utils.exceptions import OCRError
-from app.schemas.documents import OCRResponse, DocumentResponse, DocumentDeleteResponse
+from app.services.page_service import PageService
+from app.services.overlay_service import OverlayRenderer
+from app.services.upload_service import UploadService
+from app.utils.exceptions import AuthenticationError, ConflictError, OCRError
+from app.utils.http_cache import http_date, is_not_modified, make_etag
+from app.schemas.documents import (
+    OCRResponse, DocumentResponse, DocumentDeleteResponse, DocumentFilter, DocumentSearchResult,
+    DocumentBulkSelector, DocumentBulkUpdateRequest,
+    UploadSessionRequest, UploadSessionResponse, ProcessObjectRequest, StorageEventResponse
+)
+from app.schemas.pages import PageResponse, PageSummary
 from app.models.document import Document
 
 router = APIRouter()
 ocr_service = OCRService()
 document_service = DocumentService()
+overlay_renderer = OverlayRenderer(ocr_service.config, ocr_service.document_merger.artifact_writer)
+upload_service = UploadService(ocr_service.storage)
+page_service = PageService()
+ingestion_service = IngestionService(ocr_service, document_service)
+
+@router.on_event("shutdown")
+def shutdown_services():
+    ocr_service.shutdown()
 
 @router.post("/", response_model=OCRResponse)
 async def create_document(
     file: UploadFile = File(...),
+    save_artifacts: Optional[bool] = Query(default=None),
+    artifact_layout: Optional[str] = Query(default=None, pattern="^(directory|archive)$"),
+):
+    try:
+        result = await ocr_service.process_document(
+            file,
+            save_artifacts=save_artifacts,
+            artifact_layout=artifact_layout
+        )
+        return result
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest", response_model=OCRResponse, status_code=201)
+async def ingest_document(
+    response: Response,
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(default=None, max_length=200),
+    save_artifacts: Optional[bool] = Query(default=None),
+    artifact_layout: Optional[str] = Query(default=None, pattern="^(directory|archive)$"),
 ):
+    # OCR và lưu luôn; gửi lại cùng file/Idempotency-Key trả về kết quả cũ với mã 200
     try:
-        result = await ocr_service.process_document(file)
+        result, replayed = await ingestion_service.ingest(
+            file,
+            idempotency_key=idempotency_key,
+            save_artifacts=save_artifacts,
+            artifact_layout=artifact_layout
+        )
+        response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+        if replayed:
+            response.status_code = 200
         return result
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/uploads", response_model=UploadSessionResponse)
+async def create_upload(
+    upload: UploadSessionRequest,
+    request: Request,
+):
+    try:
+        session = upload_service.create_session(upload.filename, upload.content_type)
+        if session['upload_url'] is None:
+            session['upload_url'] = str(request.url_for("receive_upload", upload_id=session['upload_id']))
+        return session
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.put("/uploads/{upload_id}", name="receive_upload")
+async def receive_upload(
+    upload_id: str,
+    request: Request,
+):
+    # Thay thế presigned URL khi storage là local/memory
+    try:
+        object_name = await upload_service.accept_upload(upload_id, request.stream())
+        return {"object_name": object_name}
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/process-object", response_model=OCRResponse)
+async def process_object(
+    body: ProcessObjectRequest,
+):
+    try:
+        object_name = upload_service.validate_object_name(body.object_name)
+        return await ocr_service.process_object(
+            object_name,
+            save_artifacts=body.save_artifacts,
+            artifact_layout=body.artifact_layout
+        )
     except OCRError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _process_storage_object(key):
+    try:
+        await ocr_service.process_object(key)
+    finally:
+        upload_service.release_event_object(key)
+
+@router.post("/storage-events", response_model=StorageEventResponse)
+async def handle_storage_event(
+    event: dict,
+    background_tasks: BackgroundTasks,
+    authorization: Optional[str] = Header(default=None),
+):
+    # Webhook nhận thông báo s3:ObjectCreated từ MinIO và chạy OCR ở nền
+    try:
+        upload_service.verify_webhook(authorization)
+    except AuthenticationError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    accepted, ignored = upload_service.select_event_objects(event.get('Records', []))
+    for key in accepted:
+        background_tasks.add_task(_process_storage_object, key)
+    return StorageEventResponse(accepted=accepted, ignored=ignored)
+
 @router.get("/", response_model=List[DocumentResponse])
 async def get_documents(
+    response: Response,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
     document_type: str = Query(default=None),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(default=None, description="Các cột lớn cần tải thêm, ví dụ: content,recipient_address"),
+    include_total: bool = Query(default=False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        return await document_service.get_document_list(
+        documents, next_cursor = await document_service.get_document_list(
             db=db,
-            skip=skip,
             limit=limit,
-            document_type=document_type
+            cursor=cursor,
+            document_type=document_type,
+            fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None,
+            skip=skip
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if include_total:
+            total = await document_service.count_documents(db, document_type)
+            response.headers["X-Total-Count"] = str(total)
+        return documents
     except OCRError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/search", response_model=List[DocumentSearchResult])
+async def search_documents(
+    response: Response,
+    q: Optional[str] = Query(default=None, max_length=500),
+    filters: DocumentFilter = Depends(),
+    limit: int = Query(default=10, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    fields: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        documents, next_cursor = await document_service.search_documents(
+            db=db,
+            filters=filters,
+            limit=limit,
+            cursor=cursor,
+            fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None,
+            q=q
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return documents
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/export")
+async def export_documents(
+    export_format: str = Query(default="ndjson", alias="format", pattern="^(ndjson|csv|parquet)$"),
+    filters: DocumentFilter = Depends(),
+    fields: Optional[str] = Query(default=None),
+):
+    # Không dùng session của Depends: session phải sống đến khi stream xong
+    try:
+        encoder = document_service.create_export_encoder(
+            export_format,
+            [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        )
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filename = f"documents_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{encoder.extension}"
+    return StreamingResponse(
+        document_service.export_documents(AsyncSessionLocal, filters, encoder),
+        media_type=encoder.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.post("/save", response_model=OCRResponse)
 async def save_document(
     document_data: dict,
-    db: Session = Depends(get_db)
+    use_copy: bool = Query(default=False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        result = await document_service.save_document(document_data, db)
+        result = await document_service.save_document(document_data, db, use_copy=use_copy)
         return result
     except OCRError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.patch("/bulk")
+async def bulk_update_documents(
+    body: DocumentBulkUpdateRequest,
+):
+    # Một câu UPDATE theo lô id hoặc theo bộ lọc, kết quả trả về dạng NDJSON
+    try:
+        stream = document_service.bulk_update(AsyncSessionLocal, body)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
+@router.delete("/bulk")
+async def bulk_delete_documents(
+    body: DocumentBulkSelector,
+):
+    try:
+        stream = document_service.bulk_delete(AsyncSessionLocal, body)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(stream, media_type="application/x-ndjson")
+
 @router.delete("/{document_id}/delete", response_model=DocumentDeleteResponse)
 async def delete_document(
     document_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
 ):
     try:
         result = await document_service.delete_document(document_id, db)
@@ -73,11 +278,22 @@ async def delete_document(
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        result = await document_service.get_document_by_id(document_id, db)
-        return result
+        document_pk, updated_at = await document_service.get_document_version(document_id, db)
+        etag = make_etag(document_pk, updated_at)
+        headers = {
+            "ETag": etag,
+            "Last-Modified": http_date(updated_at),
+            "Cache-Control": "private, no-cache"
+        }
+        if is_not_modified(request.headers, etag, updated_at):
+            return Response(status_code=304, headers=headers)
+
+        body = await document_service.get_document_body(document_pk, etag, db)
+        return Response(content=body, media_type="application/json", headers=headers)
     except OCRError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -87,7 +303,7 @@ async def get_document(
 async def update_document(
     document_id: str,
     document_data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
         result = await document_service.update_document(document_id, document_data, db)
@@ -96,3 +312,50 @@ async def update_document(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{document_id}/pages", response_model=List[PageSummary])
+async def get_document_pages(
+    document_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await page_service.list_pages(db, document_id=document_id)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{document_id}/pages/{page_number}", response_model=PageResponse)
+async def get_document_page(
+    document_id: int,
+    page_number: int,
+    include_regions: bool = Query(default=True),
+    include_tables: bool = Query(default=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Chỉ tải dữ liệu của một trang, không đọc nội dung cả văn bản
+    try:
+        return await page_service.get_document_page(
+            document_id, page_number, db, include_regions, include_tables
+        )
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/artifacts/{job_id:path}/pages/{page_number}/overlay")
+async def get_page_overlay(
+    job_id: str,
+    page_number: int,
+    kind: str = Query(default="all", pattern="^(all|regions|tables|none)$"),
+    thumbnail: bool = Query(default=False),
+):
+    try:
+        content = await run_in_threadpool(overlay_renderer.render, job_id, page_number, kind, thumbnail)
+        return Response(content=content, media_type="image/jpeg")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,61 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import get_async_db
+from app.services.page_service import PageService
+from app.utils.exceptions import OCRError
+from app.utils.table_export import table_grid, table_to_csv, table_to_json
+from app.schemas.pages import PageResponse, PageSummary
+
+router = APIRouter()
+page_service = PageService()
+
+@router.get("/", response_model=List[PageSummary])
+async def get_pages(
+    job_id: Optional[str] = Query(default=None),
+    document_id: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await page_service.list_pages(db, job_id=job_id, document_id=document_id)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{page_id}", response_model=PageResponse)
+async def get_page(
+    page_id: int,
+    include_regions: bool = Query(default=True),
+    include_tables: bool = Query(default=True),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        return await page_service.get_page_by_id(page_id, db, include_regions, include_tables)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{page_id}/tables/{table_index}")
+async def export_table(
+    page_id: int,
+    table_index: int,
+    export_format: str = Query(default="json", alias="format", pattern="^(json|csv)$"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        cells = await page_service.get_table(page_id, table_index, db)
+        grid = table_grid(cells)
+        if export_format == "csv":
+            return Response(
+                content=table_to_csv(grid),
+                media_type="text/csv; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="page_{page_id}_table_{table_index}.csv"'}
+            )
+        return table_to_json(cells, grid)
+    except OCRError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
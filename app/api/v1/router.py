@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import documents
+from app.api.v1.endpoints import documents, pages
 
 api_router = APIRouter()
 
@@ -7,4 +7,10 @@ api_router.include_router(
     documents.router, 
     prefix="/documents", 
     tags=["documents"]
-)
\ No newline at end of file
+)
+
+api_router.include_router(
+    pages.router,
+    prefix="/pages",
+    tags=["pages"]
+)
@@ -1,4 +1,6 @@
 import os
+from typing import Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,13 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_HOSTNAME: str
 
+    # Ghi đè URL kết nối, ví dụ sqlite:///./ocr.db khi chạy thử cục bộ
+    DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+
     CLIENT_ORIGIN: str
 
     TESSERACT_CMD: str = os.getenv(
@@ -26,10 +35,45 @@ class Settings(BaseSettings):
         # r'C:\Users\adminb\Desktop\STUDY\IT\LapTrinhPython\poppler\poppler-24.08.0\Library\bin'
     )
 
+    # minio | local | memory
+    STORAGE_BACKEND: str = os.getenv('STORAGE_BACKEND', 'minio')
+    LOCAL_STORAGE_PATH: str = os.getenv('LOCAL_STORAGE_PATH', 'storage')
+
     MINIO_ENDPOINT: str = os.getenv('MINIO_ENDPOINT', 'http://minio:9000')
     MINIO_ACCESS_KEY: str = os.getenv('MINIO_ACCESS_KEY', 'minioadmin')
     MINIO_SECRET_KEY: str = os.getenv('MINIO_SECRET_KEY', 'minioadmin')
     MINIO_BUCKET: str = os.getenv('MINIO_BUCKET', 'ocr-bucket')
+    MINIO_REGION: str = os.getenv('MINIO_REGION', 'us-east-1')
+    # Endpoint mà client bên ngoài dùng để upload qua presigned URL
+    MINIO_PUBLIC_ENDPOINT: str = os.getenv('MINIO_PUBLIC_ENDPOINT', '')
+    MINIO_MAX_POOL_SIZE: int = int(os.getenv('MINIO_MAX_POOL_SIZE', '16'))
+    MINIO_MAX_RETRIES: int = int(os.getenv('MINIO_MAX_RETRIES', '3'))
+    MINIO_RETRY_BACKOFF: float = float(os.getenv('MINIO_RETRY_BACKOFF', '0.2'))
+    MINIO_CONNECT_TIMEOUT: float = float(os.getenv('MINIO_CONNECT_TIMEOUT', '5'))
+    MINIO_READ_TIMEOUT: float = float(os.getenv('MINIO_READ_TIMEOUT', '60'))
+
+    UPLOAD_URL_EXPIRES_SECONDS: int = int(os.getenv('UPLOAD_URL_EXPIRES_SECONDS', '900'))
+    # Khóa HMAC ký upload session (bắt buộc khi STORAGE_BACKEND là local/memory)
+    UPLOAD_SIGNING_KEY: str = os.getenv('UPLOAD_SIGNING_KEY', '')
+    UPLOAD_MAX_SIZE: int = int(os.getenv('UPLOAD_MAX_SIZE', str(200 * 1024 * 1024)))
+
+    # Token MinIO gửi trong header Authorization của webhook (notify_webhook auth_token); rỗng thì từ chối mọi event
+    STORAGE_WEBHOOK_TOKEN: str = os.getenv('STORAGE_WEBHOOK_TOKEN', '')
+    STORAGE_EVENT_MAX_RECORDS: int = int(os.getenv('STORAGE_EVENT_MAX_RECORDS', '100'))
+
+    # Quá thời gian này, một lượt ingest đang "processing" được coi là đã chết và cho chạy lại
+    INGEST_PROCESSING_TIMEOUT: int = int(os.getenv('INGEST_PROCESSING_TIMEOUT', '1800'))
+
+    # Số văn bản giữ sẵn JSON trong bộ nhớ mỗi worker, 0 để tắt
+    DOCUMENT_RESPONSE_CACHE_SIZE: int = int(os.getenv('DOCUMENT_RESPONSE_CACHE_SIZE', '256'))
+    RESPONSE_COMPRESSION_MIN_SIZE: int = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+
+    @model_validator(mode='after')
+    def check_upload_signing_key(self):
+        # Không có presigned URL thì upload session ký HMAC là đường upload duy nhất
+        if self.STORAGE_BACKEND.lower() in ('local', 'memory') and not self.UPLOAD_SIGNING_KEY:
+            raise ValueError(f"UPLOAD_SIGNING_KEY phải được đặt khi STORAGE_BACKEND={self.STORAGE_BACKEND}")
+        return self
 
     class Config:
         env_file = './.env'
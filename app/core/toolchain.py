@@ -0,0 +1,100 @@
+import os
+import shutil
+import subprocess
+import threading
+from datetime import datetime
+
+from app.core.config import settings
+from app.utils.logger import Logger
+
+logger = Logger(__name__).logger
+
+_toolchain = None
+_lock = threading.Lock()
+
+
+def _run(args, timeout=10):
+    # Gộp stdout/stderr: pdftoppm -v in phiên bản ra stderr, tesseract --version ra stdout
+    result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    return (result.stdout or '') + (result.stderr or '')
+
+
+def _first_line(output):
+    for line in output.splitlines():
+        if line.strip():
+            return line.strip()
+    return None
+
+
+def _detect_poppler():
+    # Thứ tự giống trước đây: PATH, POPPLER_PATH, rồi các thư mục cài đặt thường gặp
+    candidates = [None, settings.POPPLER_PATH, '/usr/bin', '/usr/local/bin']
+    for directory in candidates:
+        if directory is None:
+            pdftoppm = shutil.which('pdftoppm')
+        else:
+            pdftoppm = shutil.which('pdftoppm', path=directory)
+        if not pdftoppm:
+            continue
+        try:
+            version = _first_line(_run([pdftoppm, '-v']))
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"Không chạy được {pdftoppm}: {str(e)}")
+            continue
+        pdfinfo = shutil.which('pdfinfo', path=os.path.dirname(pdftoppm))
+        return {
+            'available': True,
+            # None: để pdf2image tự tìm trên PATH
+            'path': directory,
+            'pdftoppm': pdftoppm,
+            'pdfinfo': pdfinfo,
+            'version': version
+        }
+    return {'available': False, 'path': None, 'pdftoppm': None, 'pdfinfo': None, 'version': None}
+
+
+def _detect_tesseract():
+    cmd = shutil.which(settings.TESSERACT_CMD)
+    if not cmd:
+        return {'available': False, 'cmd': settings.TESSERACT_CMD, 'version': None, 'languages': []}
+    try:
+        version = _first_line(_run([cmd, '--version']))
+        # Dòng đầu của --list-langs là tiêu đề
+        languages = [line.strip() for line in _run([cmd, '--list-langs']).splitlines()[1:] if line.strip()]
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Không chạy được tesseract {cmd}: {str(e)}")
+        return {'available': False, 'cmd': cmd, 'version': None, 'languages': []}
+    return {'available': True, 'cmd': cmd, 'version': version, 'languages': languages}
+
+
+def detect_toolchain():
+    """
+    Dò poppler và tesseract (đường dẫn, phiên bản, ngôn ngữ) một lần và lưu lại cho cả tiến trình,
+    để các lần chuyển PDF không phải thử lần lượt từng poppler_path.
+    """
+    global _toolchain
+    toolchain = {
+        'poppler': _detect_poppler(),
+        'tesseract': _detect_tesseract(),
+        'detected_at': datetime.now().isoformat()
+    }
+    with _lock:
+        _toolchain = toolchain
+
+    poppler, tesseract = toolchain['poppler'], toolchain['tesseract']
+    if poppler['available']:
+        logger.info(f"Poppler: {poppler['version']} ({poppler['pdftoppm']})")
+    else:
+        logger.error("Không tìm thấy poppler (pdftoppm), không thể chuyển đổi PDF")
+    if tesseract['available']:
+        logger.info(f"Tesseract: {tesseract['version']} ({tesseract['cmd']}), ngôn ngữ: {', '.join(tesseract['languages'])}")
+    else:
+        logger.error(f"Không tìm thấy tesseract: {tesseract['cmd']}")
+    return toolchain
+
+
+def get_toolchain():
+    # Kết quả đã dò lúc khởi động; tự dò ở lần gọi đầu nếu chạy ngoài ứng dụng (CLI, benchmark)
+    if _toolchain is None:
+        return detect_toolchain()
+    return _toolchain
@@ -1,10 +1,20 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from app.api.v1.router import api_router
 from app.core.config import settings
-from app.db.base import engine
+from app.core.toolchain import detect_toolchain, get_toolchain
+from app.db.base import async_engine, init_db
+from app.utils.compression import SelectiveCompressionMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 app = FastAPI(
     title="Legal Document OCR API",
@@ -28,18 +38,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Idempotent-Replayed", "ETag", "Last-Modified"],
 )
 
+# Nén JSON lớn (nội dung OCR); brotli nếu có cài brotli-asgi, nếu không thì gzip.
+# Không nén export dạng stream (Parquet đã nén sẵn) và ảnh overlay JPEG
+COMPRESSION_EXCLUDE_PATHS = (r'^/api/v1/documents/export$', r'/overlay$')
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        SelectiveCompressionMiddleware,
+        compressor=BrotliMiddleware,
+        exclude_paths=COMPRESSION_EXCLUDE_PATHS,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        gzip_fallback=True
+    )
+else:
+    app.add_middleware(
+        SelectiveCompressionMiddleware,
+        compressor=GZipMiddleware,
+        exclude_paths=COMPRESSION_EXCLUDE_PATHS,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE
+    )
+
 app.include_router(
     api_router, 
     prefix="/api/v1",
     tags=["OCR API"]
 )
 
+@app.on_event("startup")
+async def startup():
+    await init_db()
+    # Dò poppler/tesseract một lần cho cả tiến trình
+    await run_in_threadpool(detect_toolchain)
+
+@app.on_event("shutdown")
+async def shutdown():
+    await async_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Legal Document OCR API"}
 
+@app.get("/health")
+async def health():
+    toolchain = get_toolchain()
+    healthy = (
+        toolchain['poppler']['available']
+        and toolchain['tesseract']['available']
+        and 'vie' in toolchain['tesseract']['languages']
+    )
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={"status": "ok" if healthy else "degraded", "toolchain": toolchain}
+    )
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -1,12 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from datetime import datetime
+
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text, JSON
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index('ix_documents_document_type_id', 'document_type', 'id'),
+        Index('ix_documents_document_number', 'document_number', postgresql_include=['id']),
+        Index('ix_documents_issue_date_id', 'issue_date', 'id'),
+        Index('ix_documents_issuing_agency_trgm', 'issuing_agency',
+              postgresql_using='gin', postgresql_ops={'issuing_agency': 'gin_trgm_ops'}),
+        Index('ix_documents_signer_trgm', 'signer',
+              postgresql_using='gin', postgresql_ops={'signer': 'gin_trgm_ops'}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(String(100))
+    # Liên kết với các trang (bảng pages) được lưu từ cùng một lượt OCR
+    job_id = Column(String(200), index=True)
     extraction_time = Column(DateTime)
     version = Column(String(50))
     document_type = Column(String(100))
@@ -20,4 +33,6 @@ class Document(Base):
     position = Column(String(200))
     subject = Column(Text)
     content = Column(Text)
-    page_numbers = Column(JSON)
\ No newline at end of file
+    page_numbers = Column(JSON)
+    # Dùng cho ETag/Last-Modified, tự cập nhật khi sửa qua ORM hoặc UPDATE
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from app.db.base import Base
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Một file (theo sha256) chỉ được OCR và lưu một lần
+    content_hash = Column(String(64), nullable=False, unique=True)
+    idempotency_key = Column(String(200), unique=True)
+    filename = Column(String(500))
+    # processing | completed | failed
+    status = Column(String(20), nullable=False)
+    job_id = Column(String(200))
+    document_ids = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, String, DateTime, Text, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class Page(Base):
+    __tablename__ = "pages"
+    __table_args__ = (
+        # source_page_number: thứ tự trang trong file đầu vào; page_number: số trang sau khi gộp
+        # văn bản (chỉ các trang có nội dung, NULL với trang trống)
+        UniqueConstraint('job_id', 'source_page_number', name='uq_pages_job_id_source_page_number'),
+        UniqueConstraint('job_id', 'page_number', name='uq_pages_job_id_page_number'),
+        Index('ix_pages_document_id_page_number', 'document_id', 'page_number'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey('documents.id', ondelete='SET NULL'))
+    job_id = Column(String(200), nullable=False)
+    source_page_number = Column(Integer, nullable=False)
+    page_number = Column(Integer)
+    extraction_time = Column(DateTime)
+    version = Column(String(50))
+    width = Column(Integer)
+    height = Column(Integer)
+    confidence = Column(Float)
+    ocr_text = Column(Text)
+    extracted_info = Column(JSON)
+
+    regions = relationship(
+        "Region", order_by="Region.region_index", lazy="raise", passive_deletes=True
+    )
+    table_cells = relationship(
+        "TableCell", order_by="[TableCell.table_index, TableCell.row, TableCell.col]",
+        lazy="raise", passive_deletes=True
+    )
+
+class Region(Base):
+    __tablename__ = "regions"
+
+    id = Column(Integer, primary_key=True)
+    page_id = Column(Integer, ForeignKey('pages.id', ondelete='CASCADE'), nullable=False, index=True)
+    region_index = Column(Integer, nullable=False)
+    x = Column(Integer)
+    y = Column(Integer)
+    width = Column(Integer)
+    height = Column(Integer)
+    text = Column(Text)
+    confidence = Column(Float)
+
+class TableCell(Base):
+    __tablename__ = "table_cells"
+
+    id = Column(Integer, primary_key=True)
+    page_id = Column(Integer, ForeignKey('pages.id', ondelete='CASCADE'), nullable=False, index=True)
+    table_index = Column(Integer, nullable=False)
+    row = Column(Integer, nullable=False)
+    col = Column(Integer, nullable=False)
+    row_span = Column(Integer, default=1)
+    col_span = Column(Integer, default=1)
+    x = Column(Integer)
+    y = Column(Integer)
+    width = Column(Integer)
+    height = Column(Integer)
+    text = Column(Text)
@@ -1,6 +1,6 @@
-from typing import List, Optional, Any
-from pydantic import BaseModel
-from datetime import datetime
+from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, ConfigDict, field_validator
+from datetime import date, datetime
 
 class DocumentMetadata(BaseModel):
     document_id: str
@@ -21,14 +21,80 @@ class DocumentInfo(BaseModel):
     content: Optional[str] = None
     page_numbers: List[int]
 
+class DocumentFilter(BaseModel):
+    document_type: Optional[str] = None
+    document_number: Optional[str] = None
+    issuing_agency: Optional[str] = None
+    signer: Optional[str] = None
+    issue_date_from: Optional[date] = None
+    issue_date_to: Optional[date] = None
+
+class DocumentBulkChanges(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    version: Optional[str] = None
+    document_type: Optional[str] = None
+    document_number: Optional[str] = None
+    issue_location: Optional[str] = None
+    issue_date: Optional[datetime] = None
+    issuing_agency: Optional[str] = None
+    recipients: Optional[str] = None
+    recipient_address: Optional[str] = None
+    signer: Optional[str] = None
+    position: Optional[str] = None
+    subject: Optional[str] = None
+    content: Optional[str] = None
+    page_numbers: Optional[List[int]] = None
+
+    @field_validator('issue_date', mode='before')
+    @classmethod
+    def parse_issue_date(cls, value):
+        # Chấp nhận cả định dạng dd/mm/yyyy như update_document
+        if isinstance(value, str) and '/' in value:
+            return datetime.strptime(value, '%d/%m/%Y')
+        return value
+
+class DocumentBulkSelector(BaseModel):
+    ids: Optional[List[int]] = None
+    filter: Optional[DocumentFilter] = None
+
+class DocumentBulkUpdateRequest(DocumentBulkSelector):
+    changes: DocumentBulkChanges
+
 class DocumentResponse(BaseModel):
     metadata: DocumentMetadata
     document_info: DocumentInfo
 
+class DocumentSearchResult(DocumentResponse):
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
 class DocumentDeleteResponse(BaseModel):
     isSuccess: bool
     message: str
     document_id: str
 
 class OCRResponse(BaseModel):
-    documents: List[DocumentResponse] 
\ No newline at end of file
+    documents: List[DocumentResponse]
+    job_id: Optional[str] = None
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    content_type: str = 'application/octet-stream'
+
+class UploadSessionResponse(BaseModel):
+    object_name: str
+    upload_id: Optional[str] = None
+    upload_url: str
+    method: str
+    headers: Dict[str, str]
+    expires_at: datetime
+
+class ProcessObjectRequest(BaseModel):
+    object_name: str
+    save_artifacts: Optional[bool] = None
+    artifact_layout: Optional[str] = None
+
+class StorageEventResponse(BaseModel):
+    accepted: List[str]
+    ignored: List[str]
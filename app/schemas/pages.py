@@ -0,0 +1,42 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+class RegionResponse(BaseModel):
+    region_index: int
+    x: Optional[int] = None
+    y: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    text: Optional[str] = None
+    confidence: Optional[float] = None
+
+class TableCellResponse(BaseModel):
+    table_index: int
+    row: int
+    col: int
+    row_span: Optional[int] = 1
+    col_span: Optional[int] = 1
+    x: Optional[int] = None
+    y: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    text: Optional[str] = None
+
+class PageSummary(BaseModel):
+    id: int
+    document_id: Optional[int] = None
+    job_id: str
+    source_page_number: int
+    page_number: Optional[int] = None
+    extraction_time: Optional[datetime] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    confidence: Optional[float] = None
+
+class PageResponse(PageSummary):
+    version: Optional[str] = None
+    ocr_text: Optional[str] = None
+    extracted_info: Optional[Dict[str, Any]] = None
+    regions: Optional[List[RegionResponse]] = None
+    table_cells: Optional[List[TableCellResponse]] = None
@@ -0,0 +1,266 @@
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from app.utils.logger import Logger
+
+
+JOB_ID_PATTERN = re.compile(r'^\d{8}/[^/\\]+$')
+
+IMAGE_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'png': ('PNG', 'png', 'image/png'),
+}
+
+
+class ArtifactSink(ABC):
+    """
+    Đích lưu artifact của một job (thư mục, file nén, ...)
+    """
+
+    @abstractmethod
+    def put(self, name, data, content_type='application/octet-stream'):
+        pass
+
+    def close(self):
+        pass
+
+    @property
+    @abstractmethod
+    def location(self):
+        pass
+
+
+class DirectoryArtifactSink(ArtifactSink):
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+
+    def put(self, name, data, content_type='application/octet-stream'):
+        path = os.path.join(self.base_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    @property
+    def location(self):
+        return self.base_dir
+
+
+class ArchiveArtifactSink(ArtifactSink):
+    """
+    Gom toàn bộ artifact của job vào một file zip duy nhất.
+    Ảnh đã nén (jpeg/webp) được lưu nguyên (ZIP_STORED), text/json được deflate.
+    """
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        os.makedirs(os.path.dirname(archive_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(archive_path, 'w')
+
+    def put(self, name, data, content_type='application/octet-stream'):
+        compress_type = zipfile.ZIP_STORED if content_type.startswith('image/') else zipfile.ZIP_DEFLATED
+        with self._lock:
+            self._zip.writestr(name, data, compress_type=compress_type)
+
+    def close(self):
+        with self._lock:
+            self._zip.close()
+
+    @property
+    def location(self):
+        return self.archive_path
+
+
+class ObjectStorageArtifactSink(ArtifactSink):
+    """
+    Upload artifact lên object storage song song.
+    Ảnh được lưu theo hash nội dung (artifacts/blobs/<sha256>.<ext>) nên các trang
+    giống nhau chỉ upload một lần; cuối job ghi index.json ánh xạ tên -> key.
+    """
+
+    BLOB_PREFIX = 'artifacts/blobs'
+    JOB_PREFIX = 'artifacts/jobs'
+
+    def __init__(self, storage, job_id, max_workers=8):
+        self.logger = Logger(__name__).logger
+        self.storage = storage
+        self.job_id = job_id
+        self.job_prefix = f'{self.JOB_PREFIX}/{job_id}'
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='artifact-upload')
+        self._lock = threading.Lock()
+        self._futures = []
+        self._index = {}
+        self._blob_keys = set()
+
+    def _blob_key(self, data, name):
+        ext = os.path.splitext(name)[1]
+        return f'{self.BLOB_PREFIX}/{hashlib.sha256(data).hexdigest()}{ext}'
+
+    def _upload(self, key, data, content_type, dedupe):
+        if dedupe and self.storage.object_exists(key):
+            self.logger.debug(f"Bỏ qua blob đã tồn tại: {key}")
+            return
+        self.storage.upload_file(data, key, content_type)
+
+    def put(self, name, data, content_type='application/octet-stream'):
+        dedupe = content_type.startswith('image/')
+        key = self._blob_key(data, name) if dedupe else f'{self.job_prefix}/{name}'
+
+        with self._lock:
+            self._index[name] = key
+            if dedupe and key in self._blob_keys:
+                return
+            self._blob_keys.add(key)
+            self._futures.append(self._executor.submit(self._upload, key, data, content_type, dedupe))
+
+    def close(self):
+        try:
+            done, _ = wait(self._futures)
+            errors = [f.exception() for f in done if f.exception()]
+            if errors:
+                raise errors[0]
+
+            index = {
+                'job_id': self.job_id,
+                'bucket': self.storage.bucket,
+                'objects': self._index
+            }
+            self.storage.upload_file(
+                json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                f'{self.job_prefix}/index.json',
+                'application/json'
+            )
+        finally:
+            self._executor.shutdown(wait=True)
+
+    @property
+    def location(self):
+        return self.storage.get_file_url(f'{self.job_prefix}/index.json')
+
+
+class ArtifactWriter:
+    """
+    Ghi artifact (ảnh trang, json kết quả) ở luồng nền để không chặn request
+    """
+
+    def __init__(self, config, storage=None):
+        self.logger = Logger(__name__).logger
+        self.config = config.get('artifacts', {})
+        self.storage = storage
+        self.enabled = self.config.get('enabled', True)
+        self.background = self.config.get('background', True)
+        self.layout = self.config.get('layout', 'directory')
+        self.output_dir = self.config.get('output_dir', 'output')
+        self.sink = self.config.get('sink', 'local')
+        self.upload_workers = self.config.get('upload_workers', 8)
+        self.image_format = self.config.get('image_format', 'jpeg').lower()
+        self.image_quality = self.config.get('image_quality', 85)
+        if self.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Định dạng ảnh artifact không hỗ trợ: {self.image_format}")
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.get('max_workers', 2),
+            thread_name_prefix='artifact-writer'
+        )
+
+    def create_sink(self, output_dir, date_dir, base_name, layout=None):
+        if self.sink == 'object_storage':
+            if self.storage is None:
+                raise ValueError("Chưa cấu hình StorageService cho artifact sink object_storage")
+            return ObjectStorageArtifactSink(self.storage, f'{date_dir}/{base_name}', self.upload_workers)
+        if self.sink != 'local':
+            raise ValueError(f"Artifact sink không hỗ trợ: {self.sink}")
+
+        layout = layout or self.layout
+        if layout == 'archive':
+            return ArchiveArtifactSink(os.path.join(output_dir, date_dir, f'{base_name}.zip'))
+        if layout == 'directory':
+            return DirectoryArtifactSink(os.path.join(output_dir, date_dir, base_name))
+        raise ValueError(f"Kiểu lưu artifact không hỗ trợ: {layout}")
+
+    def read(self, job_id, name):
+        """
+        Đọc lại một artifact của job bất kể nó được lưu dạng thư mục, zip hay object storage
+        """
+        if not JOB_ID_PATTERN.match(job_id) or '..' in job_id.split('/'):
+            raise ValueError(f"job_id không hợp lệ: {job_id}")
+        if name.startswith('/') or '..' in name.split('/'):
+            raise ValueError(f"Tên artifact không hợp lệ: {name}")
+
+        if self.sink == 'object_storage':
+            index = json.loads(self.storage.download_file(
+                f'{ObjectStorageArtifactSink.JOB_PREFIX}/{job_id}/index.json'
+            ))
+            key = index['objects'].get(name)
+            if key is None:
+                raise FileNotFoundError(f"Không tìm thấy artifact {name} của job {job_id}")
+            return self.storage.download_file(key)
+
+        base_dir = os.path.join(self.output_dir, job_id)
+        if os.path.isdir(base_dir):
+            path = os.path.join(base_dir, name)
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"Không tìm thấy artifact {name} của job {job_id}")
+            with open(path, 'rb') as f:
+                return f.read()
+
+        archive_path = f'{base_dir}.zip'
+        if os.path.isfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                try:
+                    return archive.read(name)
+                except KeyError:
+                    raise FileNotFoundError(f"Không tìm thấy artifact {name} của job {job_id}")
+
+        raise FileNotFoundError(f"Không tìm thấy job: {job_id}")
+
+    def encode_image(self, image):
+        pil_format, ext, content_type = IMAGE_FORMATS[self.image_format]
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        buffer = io.BytesIO()
+        if pil_format == 'PNG':
+            # Ưu tiên tốc độ nén thay vì kích thước file
+            image.save(buffer, format=pil_format, compress_level=1)
+        else:
+            image.save(buffer, format=pil_format, quality=self.image_quality)
+        return buffer.getvalue(), ext, content_type
+
+    @staticmethod
+    def encode_json(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def submit(self, write_job, sink, background=None):
+        """
+        Chạy write_job(sink) ở luồng nền (hoặc đồng bộ nếu background=False).
+        Sink luôn được đóng sau khi ghi xong.
+        """
+        background = self.background if background is None else background
+
+        def run():
+            try:
+                write_job(sink)
+                self.logger.info(f"Đã ghi artifact tại: {sink.location}")
+            except Exception as e:
+                self.logger.error(f"Lỗi ghi artifact {sink.location}: {str(e)}")
+                raise
+            finally:
+                sink.close()
+
+        if background:
+            return self._executor.submit(run)
+        run()
+        return None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
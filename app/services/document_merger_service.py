@@ -1,18 +1,19 @@
 import re
 from datetime import datetime
-import json
-import os
-from PIL import Image, ImageDraw
 import numpy as np
+from PIL import Image
 
+from app.services.artifact_writer_service import ArtifactWriter
 from app.services.information_extraction_service import InformationExtractor
 from app.utils.logger import Logger
+from app.utils.table_export import table_to_csv
 
 class DocumentMerger:
-    def __init__(self, config):
+    def __init__(self, config, storage=None):
         self.logger = Logger(__name__).logger
         self.extractor = InformationExtractor(config)
         self.doc_patterns = config['document_patterns']
+        self.artifact_writer = ArtifactWriter(config, storage)
         self.all_pages = []
 
 
@@ -94,10 +95,19 @@ class DocumentMerger:
             return obj.tolist()
         elif isinstance(obj, dict):
             return {k: self._convert_to_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
+        elif isinstance(obj, (list, tuple)):
             return [self._convert_to_serializable(item) for item in obj]
         return obj
 
+    def _table_geometry(self, table):
+        # Bỏ ảnh của từng ô, chỉ giữ lại tọa độ để vẽ overlay khi cần
+        geometry = {k: v for k, v in table.items() if k != 'cells'}
+        geometry['cells'] = [
+            {k: v for k, v in cell.items() if k != 'image'}
+            for cell in table.get('cells', [])
+        ]
+        return self._convert_to_serializable(geometry)
+
     def _extract_document_info(self, pages):
         # Lấy text từ tất cả các trang
         full_text = '\n\n'.join(page['ocr_text'] for page in pages)
@@ -182,6 +192,13 @@ class DocumentMerger:
             # Lọc bỏ các trang trống nhưng vẫn giữ lại trong all_pages
             self.all_pages = page_results
             valid_pages = [p for p in page_results if not self._is_empty_page(p)]
+
+            # Chỉ trang có nội dung được đánh số lại 1..n; trang trống không thuộc văn bản nào nên
+            # bỏ số trang để không trùng với trang đã đánh số lại (source_page_number vẫn giữ)
+            for page in page_results:
+                page.setdefault('source_page_number', page['page_number'])
+                if self._is_empty_page(page):
+                    page['page_number'] = None
             
             for i, page in enumerate(valid_pages):
                 page['page_number'] = i + 1
@@ -224,83 +241,92 @@ class DocumentMerger:
             self.logger.error(f"Lỗi gộp văn bản: {str(e)}")
             return []
 
-    def save_merged_documents(self, documents, output_dir, base_name):
+    def save_merged_documents(self, documents, output_dir, base_name, save_artifacts=None, layout=None,
+                              on_written=None):
+        """
+        Lưu ảnh trang và kết quả JSON. Việc mã hóa ảnh và ghi file chạy ở luồng nền
+        của ArtifactWriter nên không chặn request. Trả về job_id của bộ artifact.
+        on_written (nếu có) được gọi khi ghi xong, kể cả khi lỗi, chỉ khi trả về job_id.
+        """
         try:
-            # Tạo cấu trúc thư mục
+            save_artifacts = self.artifact_writer.enabled if save_artifacts is None else save_artifacts
+            if not save_artifacts:
+                self.logger.debug("Bỏ qua lưu artifact theo yêu cầu")
+                return None
+
             date_dir = datetime.now().strftime('%Y%m%d')
-            base_dir = os.path.join(output_dir, date_dir, base_name)
-            pages_dir = os.path.join(base_dir, 'pages')
-            docs_dir = os.path.join(base_dir, 'documents')
-            
-            # Tạo các thư mục
-            os.makedirs(base_dir, exist_ok=True)
-            os.makedirs(pages_dir, exist_ok=True)
-            os.makedirs(docs_dir, exist_ok=True)
-
-            # Lưu từng trang
-            for page_data in self.all_pages:
-                page_num = page_data['page_number']
-                page_dir = os.path.join(pages_dir, f'page_{str(page_num).zfill(3)}')
-                os.makedirs(page_dir, exist_ok=True)
-
-                # Lưu ảnh gốc
-                if 'processed_image' in page_data:
-                    page_data['processed_image'].save(os.path.join(page_dir, 'image.png'))
-
-                # Tạo và lưu ảnh regions
-                if 'regions' in page_data and 'processed_image' in page_data:
-                    regions_image = page_data['processed_image'].copy()
-                    draw = ImageDraw.Draw(regions_image)
-                    for region in page_data['regions']:
-                        if isinstance(region, np.ndarray):
-                            region = region.tolist()
-                        x, y, w, h = region
-                        draw.rectangle([x, y, x+w, y+h], outline='red', width=2)
-                    regions_image.save(os.path.join(page_dir, 'regions.png'))
-
-                # Lưu text OCR
-                with open(os.path.join(page_dir, 'full_text.txt'), 'w', encoding='utf-8') as f:
-                    f.write(page_data['ocr_text'])
-
-                # Chuẩn bị và lưu thông tin trang
-                page_info = {
-                    'metadata': {
-                        'page_number': page_num,
-                        'extraction_time': datetime.now().isoformat(),
-                        'version': '1.0'
-                    },
-                    'page_info': {
-                        'text_regions': self._convert_to_serializable(page_data.get('regions', [])),
-                        'tables': self._convert_to_serializable(page_data.get('tables', [])),
-                        'extracted_info': page_data.get('extracted_info', {})
-                    }
-                }
-                with open(os.path.join(page_dir, 'info.json'), 'w', encoding='utf-8') as f:
-                    json.dump(page_info, f, ensure_ascii=False, indent=2)
-
-            # Lưu từng văn bản
-            for doc in documents:
-                doc_id = doc['metadata']['document_id']
-                doc_dir = os.path.join(docs_dir, f'document_{doc_id.zfill(3)}')
-                os.makedirs(doc_dir, exist_ok=True)
-
-                # Chuẩn bị và lưu thông tin văn bản
-                doc_info = self._convert_to_serializable(doc)
-                with open(os.path.join(doc_dir, 'info.json'), 'w', encoding='utf-8') as f:
-                    json.dump(doc_info, f, ensure_ascii=False, indent=2)
-
-                # Lưu nội dung đầy đủ
-                with open(os.path.join(doc_dir, 'full_text.txt'), 'w', encoding='utf-8') as f:
-                    f.write(doc['document_info']['content'])
-
-            # Lưu file tổng hợp
-            serializable_docs = self._convert_to_serializable(documents)
-            with open(os.path.join(base_dir, 'documents.json'), 'w', encoding='utf-8') as f:
-                json.dump(serializable_docs, f, ensure_ascii=False, indent=2)
-
-            self.logger.info(f"Đã lưu {len(documents)} văn bản")
-            self.logger.info(f"Kết quả được lưu tại: {base_dir}")
-            
+            sink = self.artifact_writer.create_sink(output_dir, date_dir, base_name, layout)
+
+            # Giữ tham chiếu riêng vì self.all_pages bị ghi đè ở lần gộp tiếp theo
+            pages = list(self.all_pages)
+            documents = self._convert_to_serializable(documents)
+
+            self.artifact_writer.submit(
+                lambda s: self._write_artifacts(s, pages, documents, on_written),
+                sink
+            )
+            self.logger.info(f"Kết quả được lưu tại: {sink.location}")
+            return f'{date_dir}/{base_name}'
+
         except Exception as e:
             self.logger.error(f"Lỗi lưu văn bản: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def _write_artifacts(self, sink, pages, documents, on_written=None):
+        try:
+            self._write_page_artifacts(sink, pages, documents)
+        finally:
+            if on_written is not None:
+                on_written()
+
+    def _write_page_artifacts(self, sink, pages, documents):
+        extraction_time = datetime.now().isoformat()
+
+        # Lưu từng trang: ảnh gốc và hình học của vùng/bảng, overlay được vẽ khi có yêu cầu
+        for page_data in pages:
+            # Artifact theo số trang trong file đầu vào: duy nhất kể cả với trang trống
+            page_num = page_data['source_page_number']
+            page_dir = f'pages/page_{str(page_num).zfill(3)}'
+
+            image_name = None
+            if 'processed_image' in page_data:
+                image = page_data['processed_image']
+                if isinstance(image, str):
+                    # Trang lưu dạng đường dẫn (rasterization.paths_only): mở lại để mã hóa
+                    with Image.open(image) as page_image:
+                        data, ext, content_type = self.artifact_writer.encode_image(page_image)
+                else:
+                    data, ext, content_type = self.artifact_writer.encode_image(image)
+                image_name = f'{page_dir}/image.{ext}'
+                sink.put(image_name, data, content_type)
+
+            # Text OCR nằm luôn trong info.json để giảm số file phải ghi
+            page_info = {
+                'metadata': {
+                    'page_number': page_data.get('page_number'),
+                    'source_page_number': page_num,
+                    'extraction_time': extraction_time,
+                    'version': '1.0'
+                },
+                'page_info': {
+                    'image': image_name,
+                    'ocr_text': page_data.get('ocr_text', ''),
+                    'text_regions': self._convert_to_serializable(page_data.get('regions', [])),
+                    'tables': [self._table_geometry(t) for t in page_data.get('tables', [])],
+                    'extracted_info': page_data.get('extracted_info', {})
+                }
+            }
+            sink.put(f'{page_dir}/info.json', self.artifact_writer.encode_json(page_info), 'application/json')
+
+            # Bảng đã OCR được xuất thêm dạng CSV
+            for table_index, table in enumerate(page_data.get('tables', [])):
+                if 'rows' in table:
+                    sink.put(
+                        f'{page_dir}/table_{table_index}.csv',
+                        table_to_csv(table['rows']).encode('utf-8'),
+                        'text/csv'
+                    )
+
+        # File tổng hợp chứa đầy đủ thông tin và nội dung của từng văn bản
+        sink.put('documents.json', self.artifact_writer.encode_json(documents), 'application/json')
+        self.logger.info(f"Đã lưu {len(documents)} văn bản")
@@ -1,131 +1,527 @@
-from datetime import datetime
-from typing import List
+import base64
+import json
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from app.core.config import settings
 from app.models.document import Document
-from app.schemas.documents import OCRResponse, DocumentResponse, DocumentMetadata, DocumentInfo, DocumentDeleteResponse
-from app.utils.exceptions import OCRError
+from app.models.page import Page
+from app.schemas.documents import (
+    OCRResponse, DocumentResponse, DocumentMetadata, DocumentInfo, DocumentDeleteResponse,
+    DocumentFilter, DocumentSearchResult, DocumentBulkSelector, DocumentBulkUpdateRequest
+)
+from app.services.full_text_search_service import create_full_text_search
+from app.services.page_service import PageService
+from app.utils.export_encoders import create_export_encoder
+from app.utils.http_cache import ResponseCache
+from app.utils.exceptions import OCRError, ValidationError
 from app.utils.logger import Logger
 
 
 class DocumentService:
+    BULK_INSERT_BATCH_SIZE = 500
+    COPY_COLUMNS = [
+        'id', 'document_id', 'job_id', 'extraction_time', 'version', 'document_type', 'document_number',
+        'issue_location', 'issue_date', 'issuing_agency', 'recipients', 'recipient_address',
+        'signer', 'position', 'subject', 'content', 'page_numbers', 'updated_at'
+    ]
+
+    DEFERRABLE_FIELDS = {'content', 'recipient_address'}
+    COUNT_CACHE_TTL = 30
+
+    BULK_ID_CHUNK_SIZE = 1000
+    BULK_MAX_IDS = 100000
+
+    EXPORT_BATCH_SIZE = 1000
+    EXPORT_COLUMN_TYPES = {
+        'id': 'int', 'document_id': 'str', 'job_id': 'str', 'extraction_time': 'datetime',
+        'version': 'str', 'document_type': 'str', 'document_number': 'str', 'issue_location': 'str',
+        'issue_date': 'datetime', 'issuing_agency': 'str', 'recipients': 'str',
+        'recipient_address': 'str', 'signer': 'str', 'position': 'str', 'subject': 'str',
+        'content': 'str', 'page_numbers': 'int_list', 'updated_at': 'datetime'
+    }
+
     def __init__(self):
         self.logger = Logger(__name__).logger
+        self._count_cache = {}
+        self.page_service = PageService()
+        self.response_cache = ResponseCache(settings.DOCUMENT_RESPONSE_CACHE_SIZE)
+
+    def _document_values(self, doc: dict, extraction_time: datetime, job_id: str = None) -> dict:
+        doc_info = doc['document_info']
+
+        # Chuyển đổi định dạng ngày tháng
+        issue_date_str = doc_info.get('issue_date')
+        issue_date = None
+        if isinstance(issue_date_str, datetime):
+            # Kết quả OCRResponse đã có sẵn kiểu datetime
+            issue_date = issue_date_str
+        elif issue_date_str:
+            try:
+                issue_date = datetime.strptime(issue_date_str, '%d/%m/%Y')
+            except ValueError:
+                self.logger.warning(f"Không thể chuyển đổi ngày tháng: {issue_date_str}")
 
-    async def save_document(self, document_data: dict, db: Session) -> OCRResponse:
+        return {
+            'document_id': doc_info.get('document_number', ''),
+            'job_id': job_id,
+            'extraction_time': extraction_time,
+            'version': "1.0",
+            'document_type': doc_info.get('document_type'),
+            'document_number': doc_info.get('document_number'),
+            'issue_location': doc_info.get('issue_location'),
+            'issue_date': issue_date,
+            'issuing_agency': doc_info.get('issuing_agency'),
+            'recipients': doc_info.get('recipients'),
+            'recipient_address': doc_info.get('recipient_address'),
+            'signer': doc_info.get('signer'),
+            'position': doc_info.get('position'),
+            'subject': doc_info.get('subject'),
+            'content': doc_info.get('content'),
+            'page_numbers': doc_info.get('page_numbers', []),
+            'updated_at': extraction_time
+        }
+
+    def _parse_id(self, document_id) -> int:
         try:
-            document_responses = []
-            for doc in document_data['documents']:
-                # Chuyển đổi định dạng ngày tháng
-                issue_date_str = doc['document_info'].get('issue_date')
-                issue_date = None
-                if issue_date_str:
-                    try:
-                        issue_date = datetime.strptime(issue_date_str, '%d/%m/%Y')
-                    except ValueError:
-                        self.logger.warning(f"Không thể chuyển đổi ngày tháng: {issue_date_str}")
-
-                # Tạo document trong database
-                db_document = Document(
-                    document_id=doc['document_info'].get('document_number', ''),
-                    extraction_time=datetime.now(),
-                    version="1.0",
-                    document_type=doc['document_info'].get('document_type'),
-                    document_number=doc['document_info'].get('document_number'),
-                    issue_location=doc['document_info'].get('issue_location'),
-                    issue_date=issue_date,
-                    issuing_agency=doc['document_info'].get('issuing_agency'),
-                    recipients=doc['document_info'].get('recipients'),
-                    recipient_address=doc['document_info'].get('recipient_address'),
-                    signer=doc['document_info'].get('signer'),
-                    position=doc['document_info'].get('position'),
-                    subject=doc['document_info'].get('subject'),
-                    content=doc['document_info'].get('content'),
-                    page_numbers=doc['document_info'].get('page_numbers', [])
-                )
+            return int(document_id)
+        except (TypeError, ValueError):
+            raise OCRError(f"ID document không hợp lệ: {document_id}")
 
-                db.add(db_document)
-                db.commit()
-                db.refresh(db_document)
-
-                # Tạo response cho document đã lưu
-                document_response = DocumentResponse(
-                    metadata=DocumentMetadata(
-                        document_id=str(db_document.id),
-                        extraction_time=db_document.extraction_time,
-                        version="1.0"
-                    ),
-                    document_info=DocumentInfo(
-                        document_type=db_document.document_type,
-                        document_number=db_document.document_number,
-                        issue_location=db_document.issue_location,
-                        issue_date=db_document.issue_date,
-                        issuing_agency=db_document.issuing_agency,
-                        recipients=db_document.recipients,
-                        recipient_address=db_document.recipient_address,
-                        signer=db_document.signer,
-                        position=db_document.position,
-                        subject=db_document.subject,
-                        content=db_document.content,
-                        page_numbers=db_document.page_numbers
-                    )
-                )
-                document_responses.append(document_response)
+    async def _reserve_ids(self, count: int, db: AsyncSession) -> List[int]:
+        # Cấp trước id từ sequence của bảng documents (PostgreSQL)
+        result = await db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('documents', 'id')) FROM generate_series(1, :n)"),
+            {'n': count}
+        )
+        return [row[0] for row in result]
+
+    async def _insert_rows(self, rows: List[dict], db: AsyncSession) -> List[int]:
+        # INSERT nhiều dòng một lần. Thứ tự dòng RETURNING của INSERT nhiều VALUES không được
+        # đảm bảo, nên trên PostgreSQL id được cấp trước và ghi cùng dòng thay vì ghép theo vị trí
+        if db.bind.dialect.name == 'postgresql':
+            ids = await self._reserve_ids(len(rows), db)
+            values = [dict(row, id=document_id) for document_id, row in zip(ids, rows)]
+            for i in range(0, len(values), self.BULK_INSERT_BATCH_SIZE):
+                await db.execute(insert(Document).values(values[i:i + self.BULK_INSERT_BATCH_SIZE]))
+            return ids
+
+        documents = [Document(**row) for row in rows]
+        db.add_all(documents)
+        await db.flush()
+        return [document.id for document in documents]
+
+    async def _copy_rows(self, rows: List[dict], db: AsyncSession) -> List[int]:
+        # Cấp trước id từ sequence rồi nạp dữ liệu bằng COPY (chỉ PostgreSQL/asyncpg)
+        if db.bind.dialect.name != 'postgresql':
+            raise OCRError("COPY chỉ hỗ trợ PostgreSQL")
+
+        ids = await self._reserve_ids(len(rows), db)
+
+        records = []
+        for document_id, row in zip(ids, rows):
+            values = dict(row, id=document_id, page_numbers=json.dumps(row['page_numbers']))
+            records.append(tuple(values[column] for column in self.COPY_COLUMNS))
+
+        # Dùng cùng kết nối (và transaction) của session
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            'documents',
+            records=records,
+            columns=self.COPY_COLUMNS
+        )
+        return ids
+
+    async def persist_documents(self, document_data: dict, db: AsyncSession,
+                                use_copy: bool = False) -> List[DocumentResponse]:
+        """
+        INSERT theo lô với id cấp trước (hoặc COPY) và gắn trang của job vào văn bản,
+        không commit để caller gộp vào transaction của mình.
+        """
+        extraction_time = datetime.now()
+        job_id = document_data.get('job_id')
+        rows = [self._document_values(doc, extraction_time, job_id) for doc in document_data['documents']]
+        if not rows:
+            return []
+
+        if use_copy:
+            ids = await self._copy_rows(rows, db)
+        else:
+            ids = await self._insert_rows(rows, db)
+        for document_id, row in zip(ids, rows):
+            await self.page_service.link_document_pages(db, job_id, document_id, row['page_numbers'])
+
+        # Tạo response từ dữ liệu đã có, không cần SELECT lại
+        return [
+            self.get_document_response(Document(id=document_id, **row))
+            for document_id, row in zip(ids, rows)
+        ]
+
+    async def save_document(self, document_data: dict, db: AsyncSession, use_copy: bool = False) -> OCRResponse:
+        """
+        Lưu toàn bộ văn bản trong một transaction, không refresh từng dòng.
+        """
+        try:
+            document_responses = await self.persist_documents(document_data, db, use_copy=use_copy)
+            if not document_responses:
+                return OCRResponse(documents=[])
 
-            return OCRResponse(documents=document_responses)
+            await db.commit()
+            self.invalidate_count_cache()
+
+            self.logger.info(f"Đã lưu {len(document_responses)} văn bản")
+            return OCRResponse(documents=document_responses, job_id=document_data.get('job_id'))
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             self.logger.error(f"Error saving document: {str(e)}")
             raise OCRError(f"Failed to save document: {str(e)}")
 
+    async def get_documents_by_ids(self, document_ids: List[int], db: AsyncSession) -> List[DocumentResponse]:
+        # Giữ nguyên thứ tự id đầu vào
+        result = await db.execute(select(Document).where(Document.id.in_(document_ids)))
+        documents = {document.id: document for document in result.scalars()}
+        return [
+            self.get_document_response(documents[document_id])
+            for document_id in document_ids if document_id in documents
+        ]
+
+    def _encode_cursor(self, document_id: int) -> str:
+        return base64.urlsafe_b64encode(json.dumps({'id': document_id}).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor: str) -> int:
+        try:
+            return int(json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))['id'])
+        except Exception:
+            raise OCRError(f"Cursor không hợp lệ: {cursor}")
+
+    def _encode_search_cursor(self, rank: float, document_id: int) -> str:
+        payload = {'rank': rank, 'id': document_id}
+        return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+    def _decode_search_cursor(self, cursor: str) -> dict:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return {'rank': float(payload['rank']), 'id': int(payload['id'])}
+        except Exception:
+            raise OCRError(f"Cursor không hợp lệ: {cursor}")
+
+    def _deferred_fields(self, fields: Optional[List[str]]) -> set:
+        # Các cột lớn chỉ được tải khi client yêu cầu qua tham số fields
+        requested = set(fields or [])
+        unknown = requested - set(DocumentInfo.model_fields)
+        if unknown:
+            raise OCRError(f"Trường không hợp lệ: {', '.join(sorted(unknown))}")
+        return self.DEFERRABLE_FIELDS - requested
+
+    async def count_documents(self, db: AsyncSession, document_type: str = None) -> int:
+        # Tổng số dòng được cache ngắn hạn vì COUNT(*) phải quét toàn bảng
+        key = document_type or ''
+        cached = self._count_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        query = select(func.count(Document.id))
+        if document_type:
+            query = query.where(Document.document_type == document_type)
+        total = (await db.execute(query)).scalar_one()
+
+        self._count_cache[key] = (time.monotonic() + self.COUNT_CACHE_TTL, total)
+        return total
+
+    def invalidate_count_cache(self):
+        self._count_cache.clear()
+
+    def _like_pattern(self, value: str) -> str:
+        escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"%{escaped}%"
+
+    def _filter_conditions(self, filters: DocumentFilter) -> list:
+        conditions = []
+        if filters.document_type:
+            conditions.append(Document.document_type == filters.document_type)
+        if filters.document_number:
+            conditions.append(Document.document_number == filters.document_number)
+        # Tìm gần đúng, dùng index trigram trên PostgreSQL
+        if filters.issuing_agency:
+            conditions.append(Document.issuing_agency.ilike(self._like_pattern(filters.issuing_agency), escape='\\'))
+        if filters.signer:
+            conditions.append(Document.signer.ilike(self._like_pattern(filters.signer), escape='\\'))
+        if filters.issue_date_from:
+            conditions.append(Document.issue_date >= datetime.combine(filters.issue_date_from, datetime.min.time()))
+        if filters.issue_date_to:
+            conditions.append(Document.issue_date < datetime.combine(filters.issue_date_to + timedelta(days=1), datetime.min.time()))
+        return conditions
+
+    def _apply_filters(self, query, filters: DocumentFilter):
+        conditions = self._filter_conditions(filters)
+        return query.where(*conditions) if conditions else query
+
+    async def _fetch_page(self, db: AsyncSession, query, limit: int, cursor: str, deferred: set, skip: int = 0):
+        # Phân trang keyset theo id giảm dần (id tăng theo thời gian lưu)
+        if cursor:
+            query = query.where(Document.id < self._decode_cursor(cursor))
+        elif skip:
+            # Giữ lại OFFSET cho client cũ
+            query = query.offset(skip)
+
+        # Lọc và phân trang chỉ trên id (index-only scan được với các index có id), rồi mới
+        # tải các dòng của trang theo khóa chính
+        id_query = query.with_only_columns(Document.id).order_by(Document.id.desc()).limit(limit + 1)
+        ids = (await db.execute(id_query)).scalars().all()
+        documents = []
+        if ids:
+            result = await db.execute(
+                select(Document)
+                .where(Document.id.in_(ids))
+                .options(*(defer(getattr(Document, field)) for field in deferred))
+                .order_by(Document.id.desc())
+            )
+            documents = result.scalars().all()
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = self._encode_cursor(documents[-1].id)
+
+        return [self.get_document_response(doc, deferred) for doc in documents], next_cursor
+
     async def get_document_list(
             self,
-            db: Session,
-            skip: int = 0,
+            db: AsyncSession,
             limit: int = 10,
-            document_type: str = None
-    ) -> List[DocumentResponse]:
+            cursor: str = None,
+            document_type: str = None,
+            fields: Optional[List[str]] = None,
+            skip: int = 0
+    ) -> Tuple[List[DocumentResponse], Optional[str]]:
+        """
+        Trả về danh sách văn bản và cursor của trang tiếp theo.
+        """
+        if cursor and skip:
+            # cursor đã xác định vị trí trang, không ghép thêm OFFSET
+            raise ValidationError("Không dùng đồng thời cursor và skip", validation_target='skip')
+
         try:
-            # Base query
-            query = db.query(Document)
+            query = self._apply_filters(select(Document), DocumentFilter(document_type=document_type))
+            return await self._fetch_page(db, query, limit, cursor, self._deferred_fields(fields), skip)
 
-            # Apply filters
-            if document_type:
-                query = query.filter(Document.document_type == document_type)
+        except Exception as e:
+            self.logger.error(f"Error getting document list: {str(e)}")
+            raise OCRError(f"Failed to get document list: {str(e)}")
 
-            # Get total count for pagination
-            total = query.count()
+    async def search_documents(
+            self,
+            db: AsyncSession,
+            filters: DocumentFilter,
+            limit: int = 10,
+            cursor: str = None,
+            fields: Optional[List[str]] = None,
+            q: str = None
+    ) -> Tuple[List[DocumentSearchResult], Optional[str]]:
+        """
+        Tìm theo các trường thông tin, và theo nội dung (q) nếu có: kết quả xếp theo
+        độ liên quan, kèm đoạn trích có đánh dấu từ khớp.
+        """
+        try:
+            deferred = self._deferred_fields(fields)
+            query = self._apply_filters(select(Document), filters)
 
-            # Apply pagination
-            documents = query.offset(skip).limit(limit).all()
+            if not q or not q.strip():
+                documents, next_cursor = await self._fetch_page(db, query, limit, cursor, deferred)
+                return [DocumentSearchResult(**doc.model_dump()) for doc in documents], next_cursor
 
-            # Convert to response format
-            responses = []
-            for doc in documents:
-                responses.append(
-                    self.get_document_response(doc)
-                )
+            search = create_full_text_search(db.bind.dialect.name)
+            if not search.has_terms(q):
+                return [], None
+            query, rank = search.search_query(q, query)
+            query = query.options(*(defer(getattr(Document, field)) for field in deferred))
+            if cursor:
+                last = self._decode_search_cursor(cursor)
+                query = query.where(search.keyset_clause(rank, last['rank'], last['id']))
+
+            result = await db.execute(query.order_by(rank.desc(), Document.id.desc()).limit(limit + 1))
+            rows = result.all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last_document, last_rank = rows[-1]
+                next_cursor = self._encode_search_cursor(last_rank, last_document.id)
 
-            return responses
+            # Chỉ tạo đoạn trích cho các văn bản của trang hiện tại
+            snippets = {}
+            if rows:
+                snippet_result = await db.execute(search.snippet_query(q, [doc.id for doc, _ in rows]))
+                snippets = dict(snippet_result.all())
+
+            results = [
+                DocumentSearchResult(
+                    **self.get_document_response(doc, deferred).model_dump(),
+                    rank=doc_rank,
+                    snippet=snippets.get(doc.id)
+                )
+                for doc, doc_rank in rows
+            ]
+            return results, next_cursor
 
         except Exception as e:
-            self.logger.error(f"Error getting document list: {str(e)}")
-            raise OCRError(f"Failed to get document list: {str(e)}")
+            self.logger.error(f"Lỗi tìm kiếm document: {str(e)}")
+            raise OCRError(f"Không thể tìm kiếm document: {str(e)}")
+
+    def create_export_encoder(self, export_format: str, fields: Optional[List[str]] = None):
+        columns = list(self.EXPORT_COLUMN_TYPES)
+        if fields:
+            unknown = set(fields) - set(columns)
+            if unknown:
+                raise OCRError(f"Trường không hợp lệ: {', '.join(sorted(unknown))}")
+            columns = [column for column in columns if column in fields]
+        return create_export_encoder(export_format, columns, self.EXPORT_COLUMN_TYPES)
+
+    async def export_documents(self, session_factory, filters: DocumentFilter, encoder,
+                               batch_size: int = None) -> AsyncIterator[bytes]:
+        """
+        Stream toàn bộ văn bản khớp bộ lọc qua server-side cursor (yield_per), mỗi lô
+        được mã hóa và trả ra ngay nên bộ nhớ không phụ thuộc kích thước bảng.
+        Session được mở trong generator vì nó phải sống suốt thời gian stream.
+        """
+        batch_size = batch_size or self.EXPORT_BATCH_SIZE
+        # Chọn cột thay vì entity để không tích lũy object trong identity map
+        query = self._apply_filters(select(*(getattr(Document, column) for column in encoder.columns)), filters)
+        query = query.order_by(Document.id).execution_options(yield_per=batch_size)
+
+        total = 0
+        async with session_factory() as db:
+            try:
+                header = encoder.header()
+                if header:
+                    yield header
+
+                result = await db.stream(query)
+                async for partition in result.partitions(batch_size):
+                    total += len(partition)
+                    chunk = encoder.encode_batch([dict(row._mapping) for row in partition])
+                    if chunk:
+                        yield chunk
+
+                footer = encoder.footer()
+                if footer:
+                    yield footer
+                self.logger.info(f"Đã xuất {total} văn bản")
+
+            except Exception as e:
+                self.logger.error(f"Lỗi xuất văn bản sau {total} dòng: {str(e)}")
+                raise OCRError(f"Không thể xuất văn bản: {str(e)}")
+
+    def validate_bulk_selector(self, selector: DocumentBulkSelector):
+        # Kiểm tra trước khi bắt đầu stream để lỗi đầu vào vẫn trả về mã 400
+        if bool(selector.ids) == bool(selector.filter):
+            raise OCRError("Cần chỉ định đúng một trong hai: ids hoặc filter")
+        if selector.ids and len(selector.ids) > self.BULK_MAX_IDS:
+            raise OCRError(f"Tối đa {self.BULK_MAX_IDS} id mỗi request")
+        if selector.filter and not self._filter_conditions(selector.filter):
+            raise OCRError("Bộ lọc rỗng sẽ áp dụng cho toàn bộ văn bản")
+
+    def _bulk_line(self, payload: dict) -> bytes:
+        return (json.dumps(payload, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+    async def _bulk_apply(self, session_factory, selector: DocumentBulkSelector, action: str,
+                          execute) -> AsyncIterator[bytes]:
+        """
+        Chạy execute(db, conditions) -> số dòng bị ảnh hưởng theo từng lô id (hoặc một lần
+        với bộ lọc) trong một transaction. Lỗi từng id được stream dạng NDJSON, dòng cuối là tổng kết.
+        """
+        summary = {'action': action, 'matched': 0, 'affected': 0, 'errors': 0, 'committed': False}
+        async with session_factory() as db:
+            try:
+                if selector.ids:
+                    ids = list(dict.fromkeys(selector.ids))
+                    for i in range(0, len(ids), self.BULK_ID_CHUNK_SIZE):
+                        chunk = ids[i:i + self.BULK_ID_CHUNK_SIZE]
+                        result = await db.execute(select(Document.id).where(Document.id.in_(chunk)))
+                        existing = set(result.scalars())
+                        for document_id in chunk:
+                            if document_id not in existing:
+                                summary['errors'] += 1
+                                yield self._bulk_line({'id': document_id, 'error': 'Không tìm thấy document'})
+                        if existing:
+                            summary['matched'] += len(existing)
+                            summary['affected'] += await execute(db, [Document.id.in_(existing)])
+                else:
+                    conditions = self._filter_conditions(selector.filter)
+                    summary['matched'] = (await db.execute(
+                        select(func.count(Document.id)).where(*conditions)
+                    )).scalar_one()
+                    summary['affected'] = await execute(db, conditions)
 
-    async def delete_document(self, document_id: str, db: Session) -> DocumentDeleteResponse:
+                await db.commit()
+                summary['committed'] = True
+                self.invalidate_count_cache()
+                if selector.ids:
+                    self.response_cache.invalidate(*selector.ids)
+                else:
+                    self.response_cache.clear()
+                self.logger.info(f"Bulk {action}: {summary['affected']} văn bản, {summary['errors']} lỗi")
+
+            except Exception as e:
+                await db.rollback()
+                summary['error'] = str(e)
+                self.logger.error(f"Lỗi bulk {action}: {str(e)}")
+
+        yield self._bulk_line({'summary': summary})
+
+    def bulk_update(self, session_factory, request: DocumentBulkUpdateRequest) -> AsyncIterator[bytes]:
+        self.validate_bulk_selector(request)
+        changes = request.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise OCRError("Không có trường nào cần cập nhật")
+
+        async def execute(db, conditions):
+            result = await db.execute(
+                update(Document).where(*conditions).values(**changes)
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+
+        return self._bulk_apply(session_factory, request, 'update', execute)
+
+    def bulk_delete(self, session_factory, selector: DocumentBulkSelector) -> AsyncIterator[bytes]:
+        self.validate_bulk_selector(selector)
+
+        async def execute(db, conditions):
+            # Gỡ liên kết trang trước, không phụ thuộc ON DELETE SET NULL (SQLite)
+            await db.execute(
+                update(Page).where(Page.document_id.in_(select(Document.id).where(*conditions)))
+                .values(document_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            result = await db.execute(
+                delete(Document).where(*conditions).execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+
+        return self._bulk_apply(session_factory, selector, 'delete', execute)
+
+    async def delete_document(self, document_id: str, db: AsyncSession) -> DocumentDeleteResponse:
         try:
             # Tìm document cần xóa
-            document = db.query(Document).filter(Document.id == document_id).first()
+            document = await db.get(Document, self._parse_id(document_id))
             
             # Kiểm tra document có tồn tại không
             if document is None:
-                raise OCRError(f"Không tìm thấy document với ID: {id}")
+                raise OCRError(f"Không tìm thấy document với ID: {document_id}")
             
             # Thực hiện xóa document
-            db.delete(document)
-            db.commit()
+            await db.delete(document)
+            await db.commit()
+            self.invalidate_count_cache()
+            self.response_cache.invalidate(document.id)
             
             # Trả về response
             return DocumentDeleteResponse(
@@ -136,13 +532,13 @@ class DocumentService:
 
         except Exception as e:
             # Rollback trong trường hợp có lỗi
-            db.rollback()
+            await db.rollback()
             self.logger.error(f"Lỗi khi xóa document {document_id}: {str(e)}")
             raise OCRError(f"Không thể xóa document: {str(e)}")
 
-    async def get_document_by_id(self, document_id: str, db: Session) -> DocumentResponse:
+    async def get_document_by_id(self, document_id: str, db: AsyncSession) -> DocumentResponse:
         try:
-            document = db.query(Document).filter(Document.id == document_id).first()
+            document = await db.get(Document, self._parse_id(document_id))
             if document is None:
                 raise OCRError(f"Không tìm thấy document với ID: {document_id}")
 
@@ -152,10 +548,39 @@ class DocumentService:
             self.logger.error(f"Lỗi khi lấy thông tin document {document_id}: {str(e)}")
             raise OCRError(f"Không thể lấy thông tin document: {str(e)}")
 
-    async def update_document(self, document_id: str, document_data: dict, db: Session) -> DocumentResponse:
+    async def get_document_version(self, document_id: str, db: AsyncSession) -> Tuple[int, datetime]:
+        # Chỉ đọc cột nhỏ để có thể trả 304 mà không tải nội dung văn bản
+        document_pk = self._parse_id(document_id)
+        result = await db.execute(
+            select(Document.updated_at, Document.extraction_time).where(Document.id == document_pk)
+        )
+        row = result.first()
+        if row is None:
+            raise OCRError(f"Không tìm thấy document với ID: {document_id}")
+        return document_pk, row.updated_at or row.extraction_time or datetime.fromtimestamp(0)
+
+    async def get_document_body(self, document_pk: int, etag: str, db: AsyncSession) -> bytes:
+        """
+        JSON của DocumentResponse, lấy từ cache nếu ETag còn khớp
+        """
+        try:
+            body = self.response_cache.get(document_pk, etag)
+            if body is None:
+                document = await db.get(Document, document_pk)
+                if document is None:
+                    raise OCRError(f"Không tìm thấy document với ID: {document_pk}")
+                body = self.get_document_response(document).model_dump_json().encode('utf-8')
+                self.response_cache.set(document_pk, etag, body)
+            return body
+
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lấy thông tin document {document_pk}: {str(e)}")
+            raise OCRError(f"Không thể lấy thông tin document: {str(e)}")
+
+    async def update_document(self, document_id: str, document_data: dict, db: AsyncSession) -> DocumentResponse:
         try:
             # Tìm document cần cập nhật
-            document = db.query(Document).filter(Document.id == document_id).first()
+            document = await db.get(Document, self._parse_id(document_id))
             if document is None:
                 raise OCRError(f"Không tìm thấy document với ID: {document_id}")
 
@@ -193,38 +618,30 @@ class DocumentService:
                 document.version = metadata.get('version', document.version)
                 # Không cho phép cập nhật document_id và extraction_time từ bên ngoài
                 
-            # Lưu thay đổi vào database
-            db.commit()
-            db.refresh(document)
+            # Lưu thay đổi vào database (expire_on_commit=False nên không cần refresh)
+            await db.commit()
+            self.response_cache.invalidate(document.id)
+            # document_type có thể đã đổi nên số lượng theo loại văn bản không còn đúng
+            self.invalidate_count_cache()
 
             # Tạo và trả về response
             return self.get_document_response(document)
 
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             self.logger.error(f"Lỗi khi cập nhật document {document_id}: {str(e)}")
             raise OCRError(f"Không thể cập nhật document: {str(e)}")
 
-    def get_document_response(self, document: Document) -> DocumentResponse:
+    def get_document_response(self, document: Document, deferred=()) -> DocumentResponse:
+        # Không truy cập cột bị defer để tránh lazy load ngoài event loop
         return DocumentResponse(
             metadata=DocumentMetadata(
                 document_id=str(document.id),
                 extraction_time=document.extraction_time,
                 version=document.version
             ),
-            document_info=DocumentInfo(
-                document_type=document.document_type,
-                document_number=document.document_number,
-                issue_location=document.issue_location,
-                issue_date=document.issue_date,
-                issuing_agency=document.issuing_agency,
-                recipients=document.recipients,
-                recipient_address=document.recipient_address,
-                signer=document.signer,
-                position=document.position,
-                subject=document.subject,
-                content=document.content,
-                page_numbers=document.page_numbers
-            )
+            document_info=DocumentInfo(**{
+                field: None if field in deferred else getattr(document, field)
+                for field in DocumentInfo.model_fields
+            })
         )
-
@@ -0,0 +1,113 @@
+import re
+from abc import ABC, abstractmethod
+
+from sqlalchemy import and_, column, func, literal_column, or_, select, table, text
+
+from app.models.document import Document
+
+
+class FullTextSearch(ABC):
+    """
+    Tìm kiếm toàn văn trên nội dung OCR, không phân biệt dấu tiếng Việt.
+    rank luôn theo thứ tự "càng lớn càng liên quan" để phân trang keyset (rank, id).
+    """
+
+    HIGHLIGHT_START = '<mark>'
+    HIGHLIGHT_STOP = '</mark>'
+
+    @abstractmethod
+    def search_query(self, q, query):
+        """
+        Thêm điều kiện khớp vào query, trả về (query, biểu thức rank)
+        """
+
+    @abstractmethod
+    def snippet_query(self, q, ids):
+        """
+        Query trả về (id, snippet) cho các văn bản của trang kết quả
+        """
+
+    def has_terms(self, q):
+        # q chỉ có dấu câu/ký tự đặc biệt (ví dụ "!!!") không còn từ nào để tìm
+        return re.search(r'\w', q) is not None
+
+    def keyset_clause(self, rank, last_rank, last_id):
+        return or_(rank < last_rank, and_(rank == last_rank, Document.id < last_id))
+
+
+class PostgresFullTextSearch(FullTextSearch):
+    # Cột content_tsv, hàm f_unaccent và cấu hình simple_unaccent được tạo bởi migration,
+    # không khai báo trong model
+    content_tsv = literal_column('documents.content_tsv')
+
+    def _tsquery(self, q):
+        return func.websearch_to_tsquery('simple', func.f_unaccent(q))
+
+    def search_query(self, q, query):
+        tsquery = self._tsquery(q)
+        rank = func.ts_rank_cd(self.content_tsv, tsquery)
+        query = query.where(self.content_tsv.op('@@')(tsquery))
+        return query.add_columns(rank.label('rank')), rank
+
+    def snippet_query(self, q, ids):
+        # Cùng truy vấn bỏ dấu như khi khớp; simple_unaccent bỏ dấu từng từ của nội dung gốc
+        # để so, nên đoạn trích vẫn có dấu và đánh dấu đúng các từ đã khớp
+        options = (
+            f'StartSel={self.HIGHLIGHT_START}, StopSel={self.HIGHLIGHT_STOP}, '
+            'MaxFragments=2, MaxWords=30, MinWords=10'
+        )
+        snippet = func.ts_headline('simple_unaccent', Document.content, self._tsquery(q), options)
+        return select(Document.id, snippet).where(Document.id.in_(ids))
+
+
+class SqliteFullTextSearch(FullTextSearch):
+    # Bảng FTS5 (unicode61 remove_diacritics) được tạo bởi init_db khi chạy với SQLite
+    fts = table('documents_fts', column('rowid'))
+
+    MAX_D_VARIANTS = 4
+
+    def _term_variants(self, term):
+        # unicode61 bỏ dấu thanh nhưng giữ nguyên "đ", nên "dong" phải khớp cả "đong"
+        positions = [i for i, ch in enumerate(term) if ch in 'dD'][:self.MAX_D_VARIANTS]
+        variants = set()
+        for mask in range(1 << len(positions)):
+            chars = list(term)
+            for bit, position in enumerate(positions):
+                if mask & (1 << bit):
+                    chars[position] = 'đ'
+            variants.add(''.join(chars))
+        return sorted(variants)
+
+    def _match_expression(self, q):
+        # Đặt từng từ trong ngoặc kép để ký tự đặc biệt không bị hiểu là cú pháp FTS5
+        groups = []
+        for term in re.findall(r'\w+', q):
+            variants = ' OR '.join(f'"{variant}"' for variant in self._term_variants(term))
+            groups.append(f'({variants})')
+        return ' AND '.join(groups)
+
+    def search_query(self, q, query):
+        # bm25 càng nhỏ càng liên quan nên đổi dấu
+        rank = -func.bm25(literal_column('documents_fts'))
+        query = query.join(self.fts, self.fts.c.rowid == Document.id).where(
+            text('documents_fts MATCH :fts_query').bindparams(fts_query=self._match_expression(q))
+        )
+        return query.add_columns(rank.label('rank')), rank
+
+    def snippet_query(self, q, ids):
+        snippet = func.snippet(
+            literal_column('documents_fts'), 1,
+            self.HIGHLIGHT_START, self.HIGHLIGHT_STOP, '…', 24
+        )
+        return select(self.fts.c.rowid, snippet).where(
+            text('documents_fts MATCH :fts_query').bindparams(fts_query=self._match_expression(q)),
+            self.fts.c.rowid.in_(ids)
+        )
+
+
+def create_full_text_search(dialect_name):
+    if dialect_name == 'postgresql':
+        return PostgresFullTextSearch()
+    if dialect_name == 'sqlite':
+        return SqliteFullTextSearch()
+    raise ValueError(f"Không hỗ trợ tìm kiếm toàn văn với: {dialect_name}")
@@ -1,16 +1,19 @@
 import cv2
 import numpy as np
-from PIL import Image
 import math
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 import os
+import shutil
+import tempfile
 from PyPDF2 import PdfReader
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 
 from app.utils.logger import Logger
+from app.utils.page_image import PageImage
 from app.core.config import settings
+from app.core.toolchain import get_toolchain
 
 
 class ImagePreprocessor:
@@ -19,6 +22,7 @@ class ImagePreprocessor:
         self.config = config['preprocessing']
         self.logger.debug("Khởi tạo ImagePreprocessor với cấu hình: " +
                           str(self.config))
+        self.raster_config = config.get('rasterization', {})
         # Sử dụng đường dẫn từ cấu hình
         pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
         self.logger.debug("Khởi tạo Tesseract thành công")
@@ -54,6 +58,44 @@ class ImagePreprocessor:
             self.logger.error(f"Lỗi tạo PDF: {str(e)}")
             return None
 
+    def count_pages(self, pdf_path):
+        # Đếm trang bằng pdfinfo (chỉ đọc trailer/cây trang); không có poppler thì dùng PdfReader
+        poppler = get_toolchain()['poppler']
+        if poppler['available'] and poppler['pdfinfo']:
+            return int(pdfinfo_from_path(pdf_path, poppler_path=poppler['path'])['Pages'])
+        return len(PdfReader(pdf_path).pages)
+
+    def _document_class(self, pdf_path):
+        # PDF có lớp chữ (xuất từ phần mềm soạn thảo) hay chỉ chứa ảnh quét; chỉ đọc trang đầu
+        try:
+            text = PdfReader(pdf_path, strict=False).pages[0].extract_text() or ''
+        except Exception:
+            text = ''
+        return 'digital' if text.strip() else 'scanned'
+
+    def _raster_options(self, document_class):
+        """
+        Tham số cho pdf2image theo mục rasterization trong config.json: DPI theo loại tài liệu,
+        ảnh xám, số tiến trình pdftoppm, định dạng và ghi ra file thay vì giữ cả list ảnh trong bộ nhớ.
+        """
+        config = self.raster_config
+        dpi = config.get('dpi_by_class', {}).get(document_class, config.get('dpi', 200))
+        options = {
+            'dpi': dpi,
+            'grayscale': config.get('grayscale', False),
+            'thread_count': config.get('thread_count', 1),
+            'fmt': config.get('fmt', 'ppm')
+        }
+        if config.get('paths_only', False):
+            options['output_folder'] = tempfile.mkdtemp(prefix='ocr_pages_')
+            options['paths_only'] = True
+        return options
+
+    def release_pages(self, images):
+        # Xóa thư mục ảnh trang tạm khi convert_from_pdf trả về đường dẫn file
+        if images and isinstance(images[0], str):
+            shutil.rmtree(os.path.dirname(images[0]), ignore_errors=True)
+
     def convert_from_pdf(self, pdf_path):
         try:
             self.logger.debug(f"Bắt đầu chuyển đổi PDF: {pdf_path}")
@@ -65,8 +107,7 @@ class ImagePreprocessor:
 
             # Thử tạo PDF nếu file gốc không phải PDF hợp lệ
             try:
-                pdf = PdfReader(pdf_path)
-                num_pages = len(pdf.pages)
+                num_pages = self.count_pages(pdf_path)
                 if num_pages == 0:
                     raise Exception("PDF không có trang nào")
                 self.logger.info(f"PDF có {num_pages} trang")
@@ -78,37 +119,25 @@ class ImagePreprocessor:
                 else:
                     return None
 
-            # Chuyển đổi tất cả các trang PDF sang ảnh
-            # Thử nhiều cách để tìm poppler
-            poppler_paths_to_try = [
-                None,  # Để pdf2image tự tìm
-                settings.POPPLER_PATH,
-                '/usr/bin',
-                '/usr/local/bin',
-            ]
-
-            images = None
-            last_error = None
-
-            for poppler_path in poppler_paths_to_try:
-                try:
-                    self.logger.debug(f"Thử poppler_path: {poppler_path}")
-                    if poppler_path:
-                        images = convert_from_path(pdf_path, poppler_path=poppler_path)
-                    else:
-                        images = convert_from_path(pdf_path)
-
-                    if images:
-                        self.logger.info(f"Thành công với poppler_path: {poppler_path}")
-                        break
-
-                except Exception as e:
-                    last_error = str(e)
-                    self.logger.debug(f"Thất bại với poppler_path {poppler_path}: {str(e)}")
-                    continue
-
-            if not images and last_error:
-                raise Exception(f"Không thể chuyển đổi PDF với tất cả poppler paths. Lỗi cuối: {last_error}")
+            # Loại tài liệu chỉ cần khi cấu hình DPI khác nhau theo loại
+            document_class = None
+            if self.raster_config.get('dpi_by_class'):
+                document_class = self._document_class(pdf_path)
+                self.logger.info(f"Loại PDF: {document_class}")
+
+            # Chuyển đổi tất cả các trang PDF sang ảnh với poppler đã dò lúc khởi động
+            poppler = get_toolchain()['poppler']
+            if not poppler['available']:
+                raise Exception("Không tìm thấy poppler (pdftoppm), kiểm tra POPPLER_PATH")
+
+            options = self._raster_options(document_class)
+            self.logger.debug(f"Tham số raster: {options}")
+            try:
+                images = convert_from_path(pdf_path, poppler_path=poppler['path'], **options)
+            except Exception:
+                if 'output_folder' in options:
+                    shutil.rmtree(options['output_folder'], ignore_errors=True)
+                raise
 
             if images:
                 self.logger.info(f"Chuyển đổi thành công {len(images)} trang PDF")
@@ -121,16 +150,25 @@ class ImagePreprocessor:
             self.logger.error(f"Lỗi chuyển đổi PDF: {str(e)}")
             return None
 
+    @staticmethod
+    def _scaled_odd(size, scale, minimum=1):
+        # Kích thước kernel lẻ gần nhất với size * scale (Gaussian, adaptive threshold yêu cầu số lẻ)
+        return max(minimum, int(round((size * scale - 1) / 2)) * 2 + 1)
+
     def preprocess(self, image):
         try:
             self.logger.debug("Bắt đầu tiền xử lý ảnh")
 
-            # Chuyển đổi sang OpenCV format nếu cần
-            if isinstance(image, Image.Image):
-                image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+            # Ảnh xám (độ phân giải phân tích) lấy từ PageImage, tính một lần cho cả trang
+            page = image if isinstance(image, PageImage) else PageImage(image)
+            gray = page.analysis_gray
 
-            # Chuyển sang ảnh xám
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            # Các tham số tính bằng pixel (cấu hình theo ảnh gốc) thu nhỏ theo analysis_scale.
+            # clahe_grid_size là số ô lưới trên cả ảnh nên kích thước ô tự co theo ảnh, giữ nguyên.
+            scale = page.analysis_scale
+            gaussian_kernel = tuple(self._scaled_odd(k, scale) for k in self.config['gaussian_kernel_size'])
+            morph_kernel = tuple(max(1, int(round(k * scale))) for k in self.config['morph_kernel_size'])
+            block_size = self._scaled_odd(self.config['adaptive_block_size'], scale, minimum=3)
 
             # Áp dụng CLAHE (Contrast Limited Adaptive Histogram Equalization)
             clahe = cv2.createCLAHE(
@@ -142,12 +180,12 @@ class ImagePreprocessor:
             # Áp dụng Gaussian Blur
             blurred = cv2.GaussianBlur(
                 clahe_img,
-                tuple(self.config['gaussian_kernel_size']),
+                gaussian_kernel,
                 self.config['gaussian_sigma']
             )
 
             # Áp dụng Morphological Closing
-            kernel = np.ones(tuple(self.config['morph_kernel_size']), np.uint8)
+            kernel = np.ones(morph_kernel, np.uint8)
             closed = cv2.morphologyEx(blurred, cv2.MORPH_CLOSE, kernel)
 
             # Áp dụng Adaptive Thresholding
@@ -156,10 +194,11 @@ class ImagePreprocessor:
                 255,
                 cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                 cv2.THRESH_BINARY,
-                self.config['adaptive_block_size'],
+                block_size,
                 self.config['adaptive_c']
             )
 
+            page.binary = binary
             self.logger.debug("Hoàn thành tiền xử lý ảnh")
             return binary
 
@@ -0,0 +1,167 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.base import AsyncSessionLocal
+from app.models.ingestion_job import IngestionJob
+from app.schemas.documents import OCRResponse
+from app.utils.exceptions import ConflictError, OCRProcessError, ValidationError
+from app.utils.logger import Logger
+
+
+class IngestionService:
+    """
+    OCR và lưu văn bản trong một lần gọi, idempotent theo sha256 của file và header
+    Idempotency-Key: gửi lại cùng file trả về các dòng đã lưu, không OCR và không INSERT lại.
+    """
+
+    def __init__(self, ocr_service, document_service, session_factory=AsyncSessionLocal):
+        self.logger = Logger(__name__).logger
+        self.ocr_service = ocr_service
+        self.document_service = document_service
+        self.session_factory = session_factory
+        self.processing_timeout = timedelta(seconds=settings.INGEST_PROCESSING_TIMEOUT)
+
+    async def _find_job(self, db, content_hash, idempotency_key):
+        if idempotency_key:
+            result = await db.execute(select(IngestionJob).where(IngestionJob.idempotency_key == idempotency_key))
+            job = result.scalars().first()
+            if job is not None:
+                if job.content_hash != content_hash:
+                    raise ValidationError("Idempotency-Key đã được dùng cho một file khác", idempotency_key)
+                return job
+
+        result = await db.execute(select(IngestionJob).where(IngestionJob.content_hash == content_hash))
+        return result.scalars().first()
+
+    async def _claim(self, content_hash, idempotency_key, filename):
+        """
+        Trả về (job, replay). Chỉ một request được giữ quyền xử lý một file tại một thời điểm.
+        """
+        async with self.session_factory() as db:
+            job = await self._find_job(db, content_hash, idempotency_key)
+            now = datetime.now()
+
+            if job is None:
+                job = IngestionJob(
+                    content_hash=content_hash,
+                    idempotency_key=idempotency_key,
+                    filename=filename,
+                    status='processing',
+                    created_at=now,
+                    updated_at=now
+                )
+                db.add(job)
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    # Request khác vừa nhận cùng file/khóa
+                    await db.rollback()
+                    raise ConflictError("File đang được xử lý bởi một request khác")
+                return job, False
+
+            if job.status == 'completed':
+                return job, True
+            if job.status == 'processing' and job.updated_at > now - self.processing_timeout:
+                raise ConflictError("File đang được xử lý bởi một request khác", job.id)
+
+            # Lượt trước lỗi hoặc bị treo: nhận lại bằng UPDATE có điều kiện để tránh tranh chấp
+            result = await db.execute(
+                update(IngestionJob)
+                .where(
+                    IngestionJob.id == job.id,
+                    IngestionJob.status == job.status,
+                    IngestionJob.updated_at == job.updated_at
+                )
+                .values(
+                    status='processing',
+                    error=None,
+                    updated_at=now,
+                    idempotency_key=job.idempotency_key or idempotency_key
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise ConflictError("File đang được xử lý bởi một request khác", job.id)
+            await db.commit()
+            return job, False
+
+    async def _mark_failed(self, ingestion_id, error):
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(IngestionJob)
+                    .where(IngestionJob.id == ingestion_id)
+                    .values(status='failed', error=error, updated_at=datetime.now())
+                )
+                await db.commit()
+        except Exception as e:
+            self.logger.error(f"Không cập nhật được trạng thái ingest {ingestion_id}: {str(e)}")
+
+    async def _discard_pages(self, job_id):
+        try:
+            async with self.session_factory() as db:
+                await self.document_service.page_service.delete_pages(job_id, db)
+        except Exception as e:
+            self.logger.error(f"Không xóa được trang của job {job_id}: {str(e)}")
+
+    async def ingest(self, file, idempotency_key=None, save_artifacts=None, artifact_layout=None):
+        """
+        Trả về (OCRResponse, replayed)
+        """
+        content = await file.read()
+        await file.seek(0)
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        job, replay = await self._claim(content_hash, idempotency_key, file.filename)
+        if replay:
+            self.logger.info(f"Trả lại kết quả đã lưu cho file {content_hash[:12]} (ingest {job.id})")
+            async with self.session_factory() as db:
+                documents = await self.document_service.get_documents_by_ids(job.document_ids or [], db)
+            return OCRResponse(documents=documents, job_id=job.job_id), True
+
+        result = None
+        try:
+            result = await self.ocr_service.process_document(
+                file,
+                save_artifacts=save_artifacts,
+                artifact_layout=artifact_layout
+            )
+            if not isinstance(result, OCRResponse):
+                raise OCRProcessError(result.get('error', 'Xử lý OCR thất bại'))
+
+            # Văn bản và trạng thái ingest được ghi trong cùng một transaction
+            async with self.session_factory() as db:
+                try:
+                    documents = await self.document_service.persist_documents(result.model_dump(), db)
+                    await db.execute(
+                        update(IngestionJob)
+                        .where(IngestionJob.id == job.id)
+                        .values(
+                            status='completed',
+                            job_id=result.job_id,
+                            document_ids=[int(doc.metadata.document_id) for doc in documents],
+                            updated_at=datetime.now()
+                        )
+                    )
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+            self.document_service.invalidate_count_cache()
+
+            self.logger.info(f"Đã ingest {len(documents)} văn bản từ file {content_hash[:12]} (ingest {job.id})")
+            return OCRResponse(documents=documents, job_id=result.job_id), False
+
+        except Exception as e:
+            self.logger.error(f"Lỗi ingest file {content_hash[:12]}: {str(e)}")
+            if isinstance(result, OCRResponse):
+                # Trang đã được OCRService lưu ở transaction riêng; lượt chạy lại có job_id mới
+                # nên phải xóa ở đây để không còn trang mồ côi
+                await self._discard_pages(result.job_id)
+            await self._mark_failed(job.id, str(e))
+            raise
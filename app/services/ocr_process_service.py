@@ -1,6 +1,11 @@
 import multiprocessing
+import threading
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import shared_memory
 
+import numpy as np
 import pytesseract
 from PIL import Image
 
@@ -9,6 +14,14 @@ from app.utils.logger import Logger
 from app.core.config import settings
 
 
+def _attach_shared_memory(name):
+    # Python >= 3.13: không đăng ký lại với resource tracker vì tiến trình chính sẽ unlink
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
 class OCRModule:
     def __init__(self):
         self.logger = Logger(__name__).logger
@@ -24,48 +37,121 @@ class OCRModule:
             # Số luồng xử lý tối đa
             self.max_workers = multiprocessing.cpu_count()
             self.logger.debug(f"Số luồng xử lý tối đa: {self.max_workers}")
+
+            # Một process pool dùng chung cho mọi lô OCR (vùng văn bản, ô bảng), tạo ở lần dùng đầu
+            self._executor = None
+            self._executor_lock = threading.Lock()
         except Exception as e:
             self.logger.error(f"Lỗi khởi tạo OCR Module: {str(e)}")
             raise
 
+    def __getstate__(self):
+        # Hàm OCR được gửi sang worker kèm đối tượng này; pool và lock không pickle được
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_executor_lock'] = None
+        return state
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self, wait=True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
     def recognize_regions(self, region_images):
         self.logger.info(f"Bắt đầu nhận dạng {len(region_images)} vùng văn bản")
-        results = []
+        results = self._run_parallel(self._process_single_region, region_images)
+        self.logger.info(f"Hoàn thành nhận dạng {len(results)} vùng văn bản")
+        return results
+
+    def recognize_shared(self, image, bboxes):
+        """
+        Nhận dạng nhiều vùng (x, y, w, h) trên cùng một ảnh trang. Ảnh được chép một lần vào
+        shared memory, mỗi tác vụ chỉ gửi tên vùng nhớ, kích thước ảnh và bbox; worker cắt view
+        trên vùng nhớ chung thay vì nhận một bản sao ảnh đã pickle.
+        """
+        if not bboxes:
+            return []
+        self.logger.info(f"Bắt đầu nhận dạng {len(bboxes)} vùng văn bản (shared memory)")
+        image = np.ascontiguousarray(image)
+
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+        except Exception as e:
+            self.logger.warning(f"Không tạo được shared memory, gửi ảnh từng vùng: {str(e)}")
+            return self.recognize_regions([image[y:y + h, x:x + w] for x, y, w, h in bboxes])
+
+        try:
+            buffer = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+            buffer[:] = image
+            del buffer
+
+            shared = (shm.name, image.shape, image.dtype.str)
+            bboxes = [tuple(int(v) for v in bbox) for bbox in bboxes]
+            results = self._run_parallel(partial(self._process_shared_region, shared), bboxes)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.logger.info(f"Hoàn thành nhận dạng {len(results)} vùng văn bản")
+        return results
 
+    def _run_parallel(self, func, items):
         try:
-            # Xử lý song song với ProcessPoolExecutor
-            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit các công việc
-                future_to_image = {
-                    executor.submit(self._process_single_region, image): i
-                    for i, image in enumerate(region_images)
-                }
-
-                # Thu thập kết quả theo thứ tự hoàn thành
-                completed_results = [None] * len(region_images)
-                for future in as_completed(future_to_image):
-                    index = future_to_image[future]
-                    try:
-                        result = future.result()
-                        completed_results[index] = result
-                        self.logger.debug(f"Hoàn thành OCR vùng {index} với độ tin cậy {result['confidence']}%")
-                    except Exception as e:
-                        self.logger.error(f"Lỗi xử lý vùng {index}: {str(e)}")
-                        completed_results[index] = {
-                            'text': '',
-                            'confidence': 0
-                        }
-
-                results = completed_results
+            # Xử lý song song trên process pool dùng chung
+            executor = self.executor
+            future_to_image = {
+                executor.submit(func, item): i
+                for i, item in enumerate(items)
+            }
+
+            # Thu thập kết quả theo thứ tự hoàn thành
+            completed_results = [None] * len(items)
+            for future in as_completed(future_to_image):
+                index = future_to_image[future]
+                try:
+                    result = future.result()
+                    completed_results[index] = result
+                    self.logger.debug(f"Hoàn thành OCR vùng {index} với độ tin cậy {result['confidence']}%")
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Lỗi xử lý vùng {index}: {str(e)}")
+                    completed_results[index] = {
+                        'text': '',
+                        'confidence': 0
+                    }
+
+            return completed_results
 
         except Exception as e:
             self.logger.error(f"Lỗi xử lý song song: {str(e)}")
+            if isinstance(e, BrokenProcessPool):
+                # Worker chết (ví dụ bị OOM kill): bỏ pool hỏng để lần sau tạo pool mới
+                self.shutdown(wait=False)
             # Fallback về xử lý tuần tự nếu có lỗi
             self.logger.info("Chuyển sang xử lý tuần tự")
-            results = [self._process_single_region(image) for image in region_images]
+            return [func(item) for item in items]
 
-        self.logger.info(f"Hoàn thành nhận dạng {len(results)} vùng văn bản")
-        return results
+    def _process_shared_region(self, shared, bbox):
+        name, shape, dtype = shared
+        shm = _attach_shared_memory(name)
+        try:
+            page = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            x, y, w, h = bbox
+            result = self._process_single_region(page[y:y + h, x:x + w])
+            del page
+            return result
+        finally:
+            shm.close()
 
     def _process_single_region(self, image):
         try:
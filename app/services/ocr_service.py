@@ -1,6 +1,7 @@
 import json
 import multiprocessing
 import os
+import tempfile
 from datetime import datetime
 from typing import List
 
@@ -9,17 +10,21 @@ from fastapi import UploadFile
 from sqlalchemy.orm import Session
 from starlette.datastructures import UploadFile
 
+from app.db.base import AsyncSessionLocal
 from app.models.document import Document
 from app.schemas.documents import OCRResponse, DocumentInfo, DocumentMetadata, DocumentResponse
 from app.services.document_merger_service import DocumentMerger
 from app.services.image_preprocessing_service import ImagePreprocessor
 from app.services.information_extraction_service import InformationExtractor
 from app.services.ocr_process_service import OCRModule
+from app.services.page_service import PageService
 from app.services.region_segmentation_service import RegionSegmenter
 from app.services.table_detector_service import TableDetector
+from app.services.table_ocr_service import TableOCR
 from app.utils.cache_manager import CacheManager
 from app.utils.exceptions import FileError, OCRProcessError, OCRError
 from app.utils.logger import Logger
+from app.utils.page_image import PageImage
 from app.utils.validation import Validator
 from app.services.storage_service import StorageService
 
@@ -47,7 +52,12 @@ class OCRService:
             self.ocr = OCRModule()
             self.extractor = InformationExtractor(self.config)
             self.table_detector = TableDetector(self.config)
-            self.document_merger = DocumentMerger(self.config)
+            self.document_merger = DocumentMerger(self.config, self.storage)
+            self.table_ocr = TableOCR(self.config, self.ocr)
+            self.page_service = PageService()
+            self.persist_pages = self.config.get('pages', {}).get('persist', True)
+            # Tỷ lệ ảnh dùng cho tiền xử lý/tìm vùng/dò bảng; OCR luôn dùng ảnh gốc
+            self.analysis_scale = self.config.get('analysis', {}).get('scale', 1.0)
 
             self.logger.info("Khởi tạo các module thành công")
 
@@ -55,12 +65,10 @@ class OCRService:
             self.logger.error(f"Lỗi khởi tạo hệ thống: {str(e)}")
             raise
 
-    async def process_document(self, file):
+    async def process_document(self, file, save_artifacts=None, artifact_layout=None):
         self.logger.info(f"Bắt đầu xử lý tài liệu")
         try:
-            # Tạo các thư mục cần thiết (chỉ còn output cho kết quả)
-            if not os.path.exists('output'):
-                os.makedirs('output')
+            file_bytes = None
 
             # Xử lý file input
             if isinstance(file, UploadFile):
@@ -73,20 +81,24 @@ class OCRService:
                 # Upload lên MinIO
                 minio_url = self.storage.upload_file(content, f"input/{filename}", file.content_type or 'application/octet-stream')
                 input_path = filename  # Lưu tên file để xử lý tiếp
+                file_bytes = content  # Đã có nội dung, không cần tải lại từ storage
             else:
                 input_path = file
-                
+
+            images = None
+            # Thư mục ảnh trang tạm (rasterization.paths_only) được xóa sau khi ghi xong artifact
+            # nếu đã giao cho luồng ghi artifact, nếu không thì xóa ngay khi kết thúc xử lý
+            pages_handed_off = False
             try:
                 # Đọc và xử lý ảnh
-                file_bytes = None
-                if isinstance(file, UploadFile) or (isinstance(input_path, str) and not os.path.exists(input_path)):
-                    minio_key = f"input/{input_path}" if not input_path.startswith("input/") else input_path
+                if file_bytes is None and isinstance(input_path, str) and not os.path.exists(input_path):
+                    minio_key = input_path if input_path.startswith(("input/", "uploads/")) else f"input/{input_path}"
                     file_bytes = self.storage.download_file(minio_key)
 
                 if input_path.lower().endswith('.pdf'):
                     if file_bytes:
                         # Lưu tạm file pdf để dùng convert_from_pdf
-                        tmp_pdf = f"/tmp/{input_path}"
+                        tmp_pdf = os.path.join(tempfile.gettempdir(), os.path.basename(input_path))
                         with open(tmp_pdf, "wb") as f:
                             f.write(file_bytes)
                         images = self.preprocessor.convert_from_pdf(tmp_pdf)
@@ -103,54 +115,91 @@ class OCRService:
                         images = [Image.open(input_path)]
 
                 all_results = []
+                self.table_detector.reset_stats()
                 # Xử lý từng trang
                 for page_num, image in enumerate(images, 1):
                     self.logger.info(f"Xử lý trang {page_num}/{len(images)}")
                     try:
+                        # Trang được raster ra file (rasterization.paths_only): chỉ giải mã khi tới lượt
+                        image_path = image if isinstance(image, str) else None
+                        if image_path:
+                            image = Image.open(image_path)
+                            image.load()
+
+                        # Mọi bước dùng chung một PageImage để không chuyển đổi ảnh lặp lại
+                        page = PageImage(image, self.analysis_scale)
+
                         # Tiền xử lý ảnh
-                        binary_image = self.preprocessor.preprocess(image)
+                        self.preprocessor.preprocess(page)
+
+                        # Phát hiện bảng trước để không OCR lại vùng nằm trong bảng
+                        tables = self.table_detector.detect_tables(page)
+                        if tables:
+                            self.logger.info(f"Đã phát hiện {len(tables)} bảng trong trang {page_num}")
 
                         # Tìm các vùng văn bản
-                        regions = self.segmenter.find_text_regions(binary_image)
-                        if not regions:
+                        regions = self.table_ocr.exclude_regions(
+                            self.segmenter.find_text_regions(page), tables
+                        )
+                        if not regions and not tables:
                             self.logger.warning(f"Không tìm thấy vùng văn bản nào trong trang {page_num}")
                             continue
 
-                        # Vẽ khung vùng văn bản
-                        marked_image = self.segmenter.draw_regions(image, regions)
+                        # OCR các vùng: worker đọc vùng trực tiếp từ ảnh trang trong shared memory
+                        ocr_results = self.ocr.recognize_shared(page.gray if page.is_grayscale else page.rgb, regions)
 
-                        # Trích xuất và OCR các vùng
-                        region_images = self.segmenter.extract_regions(image, regions)
-                        ocr_results = self.ocr.recognize_regions(region_images)
+                        # OCR các ô bảng thành một lô
+                        if tables and self.table_ocr.enabled:
+                            self.table_ocr.recognize_tables(tables, page.detail)
 
-                        # Kết hợp kết quả OCR
-                        full_text = '\n'.join([result['text'] for result in ocr_results])
+                        # Ảnh ô bảng và các biểu diễn trung gian không còn cần sau OCR, chỉ giữ ảnh gốc
+                        for table in tables:
+                            for cell in table['cells']:
+                                cell.pop('image', None)
+                        page.release('rgb', 'bgr', 'gray', 'analysis_gray', 'binary', 'downscaled')
+
+                        # Kết hợp kết quả OCR theo thứ tự từ trên xuống
+                        blocks = [(region[1], result['text']) for region, result in zip(regions, ocr_results)]
+                        for table in tables:
+                            table_text = self.table_ocr.table_text(table)
+                            if table_text:
+                                blocks.append((table['bbox'][1], table_text))
+                        full_text = '\n'.join(text for _, text in sorted(blocks, key=lambda block: block[0]))
 
                         # Trích xuất thông tin
                         extracted_info = self.extractor.extract_information(full_text)['document_info']
 
-                        # Phát hiện bảng
-                        tables = self.table_detector.detect_tables(binary_image)
-                        if tables:
-                            self.logger.info(f"Đã phát hiện {len(tables)} bảng trong trang {page_num}")
-                            for table in tables:
-                                marked_image = self.table_detector.draw_table_boundaries(marked_image, table)
-
-                        # Lưu kết quả trang
+                        # Lưu kết quả trang (chỉ giữ hình học, ảnh overlay được vẽ khi cần)
                         page_result = {
                             'page_number': page_num,
-                            'processed_image': marked_image,
+                            # Số trang trong file đầu vào, không đổi khi DocumentMerger đánh số lại
+                            'source_page_number': page_num,
+                            # Với paths_only chỉ giữ đường dẫn, ảnh được mở lại khi ghi artifact,
+                            # để bộ nhớ không tăng theo số trang
+                            'processed_image': image_path or page.pil,
+                            'image_size': page.size,
                             'ocr_text': full_text,
+                            'ocr_results': ocr_results,
                             'extracted_info': extracted_info,
                             'regions': regions,
                             'tables': tables if tables else []
                         }
                         all_results.append(page_result)
+                        if image_path:
+                            image.close()
 
                     except Exception as e:
                         self.logger.error(f"Lỗi xử lý trang {page_num}: {str(e)}")
                         continue
 
+                table_stats = self.table_detector.stats_summary()
+                self.logger.info(
+                    f"Dò bảng: bỏ qua {table_stats['skipped']}/{table_stats['pages']} trang "
+                    f"(dò nhanh {table_stats['probe_time']:.3f}s), tiết kiệm ước tính "
+                    + ", ".join(f"{stage} {saved:.3f}s" for stage, saved in table_stats['saved_time'].items())
+                    + f", tổng {table_stats['net_saved_time']:.3f}s"
+                )
+
                 if not all_results:
                     raise OCRProcessError("Không xử lý được trang nào")
 
@@ -159,11 +208,20 @@ class OCRService:
 
                 # Lưu kết quả đã gộp
                 base_name = os.path.splitext(os.path.basename(input_path))[0]
-                self.document_merger.save_merged_documents(
+                job_id = self.document_merger.save_merged_documents(
                     merged_docs,
-                    'output',
-                    base_name
+                    self.document_merger.artifact_writer.output_dir,
+                    base_name,
+                    save_artifacts=save_artifacts,
+                    layout=artifact_layout,
+                    on_written=lambda: self.preprocessor.release_pages(images)
                 )
+                pages_handed_off = job_id is not None
+                # job_id vẫn cần để liên kết trang với văn bản khi không lưu artifact
+                job_id = job_id or f"{datetime.now().strftime('%Y%m%d')}/{base_name}"
+
+                if self.persist_pages:
+                    await self._save_pages(job_id, all_results)
 
                 self.logger.info(f"Xử lý thành công {len(all_results)} trang")
                 ocr_result = {
@@ -210,11 +268,14 @@ class OCRService:
                     )
                     document_responses.append(document_response)
 
-                return OCRResponse(documents=document_responses)
+                return OCRResponse(documents=document_responses, job_id=job_id)
 
             except Exception as e:
                 self.logger.error(f"Lỗi xử lý tài liệu: {str(e)}")
                 raise
+            finally:
+                if not pages_handed_off:
+                    self.preprocessor.release_pages(images)
 
         except Exception as e:
             self.logger.error(f"Lỗi xử lý tài liệu: {str(e)}")
@@ -223,4 +284,26 @@ class OCRService:
                 'error': str(e)
             }
 
+    async def _save_pages(self, job_id, pages):
+        # Ghi vùng/ô bảng của cả job một lần; lỗi ghi DB không làm hỏng kết quả OCR
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.page_service.save_pages(job_id, pages, db)
+        except Exception as e:
+            self.logger.error(f"Không lưu được dữ liệu trang của job {job_id}: {str(e)}")
+
+    async def process_object(self, object_name, save_artifacts=None, artifact_layout=None):
+        # Xử lý file đã được client upload thẳng lên storage
+        self.logger.info(f"Xử lý object từ storage: {object_name}")
+        return await self.process_document(
+            object_name,
+            save_artifacts=save_artifacts,
+            artifact_layout=artifact_layout
+        )
+
+    def shutdown(self):
+        # Chờ các artifact đang ghi ở luồng nền hoàn tất, rồi dừng process pool OCR
+        self.document_merger.artifact_writer.shutdown(wait=True)
+        self.ocr.shutdown()
+
 
@@ -0,0 +1,107 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from app.services.region_segmentation_service import RegionSegmenter
+from app.services.table_detector_service import TableDetector
+from app.utils.logger import Logger
+
+
+class OverlayRenderer:
+    """
+    Vẽ overlay vùng văn bản/bảng từ ảnh trang và hình học đã lưu, chỉ khi có yêu cầu.
+    Kết quả được cache trong bộ nhớ (LRU) và trên đĩa.
+    """
+
+    KINDS = ('all', 'regions', 'tables', 'none')
+
+    def __init__(self, config, artifact_writer):
+        self.logger = Logger(__name__).logger
+        self.config = config.get('overlays', {})
+        self.artifact_writer = artifact_writer
+        self.segmenter = RegionSegmenter(config)
+        self.table_detector = TableDetector(config)
+
+        self.memory_cache_size = self.config.get('memory_cache_size', 64)
+        self.disk_cache_dir = self.config.get('disk_cache_dir', 'cache/overlays')
+        self.thumbnail_size = self.config.get('thumbnail_size', 512)
+        self.image_quality = self.config.get('image_quality', 80)
+
+        self._memory_cache = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.disk_cache_dir, exist_ok=True)
+
+    def _cache_key(self, job_id, page_number, kind, thumbnail, info):
+        # Gồm hash của info.json: khi job được ghi lại, overlay cũ (bộ nhớ và đĩa) không còn khớp
+        digest = hashlib.sha256(info).hexdigest()
+        raw = f'{job_id}|{page_number}|{kind}|{self.thumbnail_size if thumbnail else 0}|{digest}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _cache_get(self, key):
+        with self._lock:
+            if key in self._memory_cache:
+                self._memory_cache.move_to_end(key)
+                return self._memory_cache[key]
+
+        path = os.path.join(self.disk_cache_dir, f'{key}.jpg')
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            self._remember(key, data)
+            return data
+        return None
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory_cache[key] = data
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+
+    def _cache_set(self, key, data):
+        self._remember(key, data)
+        path = os.path.join(self.disk_cache_dir, f'{key}.jpg')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def render(self, job_id, page_number, kind='all', thumbnail=False):
+        if kind not in self.KINDS:
+            raise ValueError(f"Loại overlay không hỗ trợ: {kind}")
+
+        page_dir = f'pages/page_{str(page_number).zfill(3)}'
+        info = self.artifact_writer.read(job_id, f'{page_dir}/info.json')
+
+        key = self._cache_key(job_id, page_number, kind, thumbnail, info)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self.logger.debug(f"Sử dụng overlay từ cache: {job_id} trang {page_number}")
+            return cached
+
+        page_info = json.loads(info)['page_info']
+        if not page_info.get('image'):
+            raise FileNotFoundError(f"Trang {page_number} của job {job_id} không có ảnh")
+
+        image = Image.open(io.BytesIO(self.artifact_writer.read(job_id, page_info['image'])))
+        image = image.convert('RGB')
+
+        if kind in ('all', 'regions'):
+            image = self.segmenter.draw_regions(image, page_info.get('text_regions', []))
+        if kind in ('all', 'tables') and page_info.get('tables'):
+            image = self.table_detector.draw_tables(image, page_info['tables'])
+
+        if thumbnail:
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=self.image_quality)
+        data = buffer.getvalue()
+
+        self._cache_set(key, data)
+        return data
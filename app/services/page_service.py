@@ -0,0 +1,257 @@
+import json
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.page import Page, Region, TableCell
+from app.schemas.pages import PageResponse, PageSummary, RegionResponse, TableCellResponse
+from app.utils.exceptions import OCRError
+from app.utils.logger import Logger
+
+
+class PageService:
+    """
+    Lưu dữ liệu từng trang (vùng văn bản, ô bảng, text OCR) vào các bảng chuẩn hóa
+    và tải dữ liệu của một trang khi cần, không phải đọc cả nội dung văn bản.
+    """
+
+    BULK_INSERT_BATCH_SIZE = 1000
+
+    def __init__(self):
+        self.logger = Logger(__name__).logger
+
+    def _page_values(self, job_id: str, page: dict, extraction_time: datetime) -> dict:
+        width, height = page.get('image_size') or (None, None)
+
+        confidences = [result.get('confidence', 0) for result in page.get('ocr_results', [])]
+        return {
+            'job_id': job_id,
+            'source_page_number': page['source_page_number'],
+            'page_number': page.get('page_number'),
+            'extraction_time': extraction_time,
+            'version': '1.0',
+            'width': width,
+            'height': height,
+            'confidence': float(sum(confidences) / len(confidences)) if confidences else None,
+            'ocr_text': page.get('ocr_text', ''),
+            # Giá trị trích xuất có thể chứa kiểu không serialize được (ngày, numpy)
+            'extracted_info': json.loads(json.dumps(page.get('extracted_info', {}), default=str))
+        }
+
+    def _region_rows(self, page_id: int, page: dict) -> List[dict]:
+        ocr_results = page.get('ocr_results', [])
+        rows = []
+        for index, (x, y, w, h) in enumerate(page.get('regions', [])):
+            result = ocr_results[index] if index < len(ocr_results) else {}
+            rows.append({
+                'page_id': page_id,
+                'region_index': index,
+                'x': int(x), 'y': int(y), 'width': int(w), 'height': int(h),
+                'text': result.get('text'),
+                'confidence': float(result.get('confidence', 0)) if result else None
+            })
+        return rows
+
+    def _cell_rows(self, page_id: int, page: dict) -> List[dict]:
+        rows = []
+        for table_index, table in enumerate(page.get('tables', [])):
+            for cell in table.get('cells', []):
+                x1, y1, x2, y2 = cell['bbox']
+                row, col = cell['position']
+                rows.append({
+                    'page_id': page_id,
+                    'table_index': table_index,
+                    'row': int(row), 'col': int(col),
+                    'row_span': int(cell.get('row_span', 1)), 'col_span': int(cell.get('col_span', 1)),
+                    'x': int(x1), 'y': int(y1), 'width': int(x2 - x1), 'height': int(y2 - y1),
+                    'text': cell.get('text')
+                })
+        return rows
+
+    async def _insert_pages(self, rows: List[dict], db: AsyncSession) -> List[int]:
+        # Giống DocumentService: trên PostgreSQL cấp trước id từ sequence (thứ tự RETURNING của
+        # INSERT nhiều VALUES không được đảm bảo), nếu không thì flush
+        if db.bind.dialect.name == 'postgresql':
+            result = await db.execute(
+                text("SELECT nextval(pg_get_serial_sequence('pages', 'id')) FROM generate_series(1, :n)"),
+                {'n': len(rows)}
+            )
+            ids = [row[0] for row in result]
+            await db.execute(insert(Page).values([dict(row, id=page_id) for page_id, row in zip(ids, rows)]))
+            return ids
+
+        pages = [Page(**row) for row in rows]
+        db.add_all(pages)
+        await db.flush()
+        return [page.id for page in pages]
+
+    async def _insert_many(self, model, rows: List[dict], db: AsyncSession):
+        # executemany theo lô, không tạo object ORM cho từng vùng/ô
+        for i in range(0, len(rows), self.BULK_INSERT_BATCH_SIZE):
+            await db.execute(insert(model), rows[i:i + self.BULK_INSERT_BATCH_SIZE])
+
+    async def _delete_job_pages(self, job_id: str, db: AsyncSession):
+        # Xóa tường minh vùng/ô cũ, không dựa vào ON DELETE CASCADE (SQLite mặc định tắt khóa ngoại)
+        # (không đồng bộ session: điều kiện IN (subquery) không đánh giá được trong Python)
+        old_pages = select(Page.id).where(Page.job_id == job_id)
+        for statement in (
+            delete(Region).where(Region.page_id.in_(old_pages)),
+            delete(TableCell).where(TableCell.page_id.in_(old_pages)),
+            delete(Page).where(Page.job_id == job_id),
+        ):
+            await db.execute(statement.execution_options(synchronize_session=False))
+
+    async def delete_pages(self, job_id: str, db: AsyncSession):
+        """
+        Xóa toàn bộ trang (và vùng/ô bảng) của một lượt OCR, ví dụ khi lưu văn bản của lượt đó thất bại.
+        """
+        try:
+            await self._delete_job_pages(job_id, db)
+            await db.commit()
+            self.logger.info(f"Đã xóa dữ liệu trang của job {job_id}")
+        except Exception as e:
+            await db.rollback()
+            self.logger.error(f"Lỗi xóa trang của job {job_id}: {str(e)}")
+            raise OCRError(f"Không thể xóa trang: {str(e)}")
+
+    async def save_pages(self, job_id: str, pages: List[dict], db: AsyncSession) -> List[int]:
+        """
+        Ghi toàn bộ trang của một lượt OCR trong một transaction. Chạy lại cùng job_id
+        sẽ thay thế dữ liệu cũ.
+        """
+        try:
+            if not pages:
+                return []
+
+            await self._delete_job_pages(job_id, db)
+
+            extraction_time = datetime.now()
+            page_ids = await self._insert_pages(
+                [self._page_values(job_id, page, extraction_time) for page in pages], db
+            )
+
+            region_rows, cell_rows = [], []
+            for page_id, page in zip(page_ids, pages):
+                region_rows.extend(self._region_rows(page_id, page))
+                cell_rows.extend(self._cell_rows(page_id, page))
+            if region_rows:
+                await self._insert_many(Region, region_rows, db)
+            if cell_rows:
+                await self._insert_many(TableCell, cell_rows, db)
+
+            await db.commit()
+            self.logger.info(
+                f"Đã lưu {len(page_ids)} trang, {len(region_rows)} vùng, {len(cell_rows)} ô bảng của job {job_id}"
+            )
+            return page_ids
+
+        except Exception as e:
+            await db.rollback()
+            self.logger.error(f"Lỗi lưu trang của job {job_id}: {str(e)}")
+            raise OCRError(f"Không thể lưu trang: {str(e)}")
+
+    async def link_document_pages(self, db: AsyncSession, job_id: str, document_id: int, page_numbers: List[int]):
+        # Gắn các trang của job vào văn bản vừa lưu, commit cùng transaction của văn bản.
+        # page_numbers là số trang sau khi gộp, duy nhất trong job (trang trống có page_number NULL)
+        if not job_id or not page_numbers:
+            return
+        await db.execute(
+            update(Page)
+            .where(Page.job_id == job_id, Page.page_number.in_(page_numbers))
+            .values(document_id=document_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _load_options(self, include_regions: bool, include_tables: bool):
+        options = []
+        if include_regions:
+            options.append(selectinload(Page.regions))
+        if include_tables:
+            options.append(selectinload(Page.table_cells))
+        return options
+
+    def get_page_response(self, page: Page, include_regions: bool = True, include_tables: bool = True) -> PageResponse:
+        return PageResponse(
+            **PageSummary.model_validate(page, from_attributes=True).model_dump(),
+            version=page.version,
+            ocr_text=page.ocr_text,
+            extracted_info=page.extracted_info,
+            regions=[
+                RegionResponse.model_validate(region, from_attributes=True) for region in page.regions
+            ] if include_regions else None,
+            table_cells=[
+                TableCellResponse.model_validate(cell, from_attributes=True) for cell in page.table_cells
+            ] if include_tables else None
+        )
+
+    async def get_page_by_id(self, page_id: int, db: AsyncSession,
+                             include_regions: bool = True, include_tables: bool = True) -> PageResponse:
+        try:
+            query = select(Page).where(Page.id == page_id).options(
+                *self._load_options(include_regions, include_tables)
+            )
+            page = (await db.execute(query)).scalars().first()
+            if page is None:
+                raise OCRError(f"Không tìm thấy trang với ID: {page_id}")
+            return self.get_page_response(page, include_regions, include_tables)
+
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lấy trang {page_id}: {str(e)}")
+            raise OCRError(f"Không thể lấy thông tin trang: {str(e)}")
+
+    async def get_table(self, page_id: int, table_index: int, db: AsyncSession) -> List[dict]:
+        # Các ô của một bảng theo thứ tự hàng/cột, dùng để xuất CSV/JSON
+        try:
+            result = await db.execute(
+                select(TableCell.row, TableCell.col, TableCell.row_span, TableCell.col_span, TableCell.text)
+                .where(TableCell.page_id == page_id, TableCell.table_index == table_index)
+                .order_by(TableCell.row, TableCell.col)
+            )
+            cells = [dict(row._mapping) for row in result]
+            if not cells:
+                raise OCRError(f"Không tìm thấy bảng {table_index} của trang {page_id}")
+            return cells
+
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lấy bảng {table_index} của trang {page_id}: {str(e)}")
+            raise OCRError(f"Không thể lấy bảng: {str(e)}")
+
+    async def get_document_page(self, document_id: int, page_number: int, db: AsyncSession,
+                                include_regions: bool = True, include_tables: bool = True) -> PageResponse:
+        try:
+            query = select(Page).where(
+                Page.document_id == document_id, Page.page_number == page_number
+            ).options(*self._load_options(include_regions, include_tables))
+            page = (await db.execute(query)).scalars().first()
+            if page is None:
+                raise OCRError(f"Không tìm thấy trang {page_number} của document {document_id}")
+            return self.get_page_response(page, include_regions, include_tables)
+
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lấy trang {page_number} của document {document_id}: {str(e)}")
+            raise OCRError(f"Không thể lấy thông tin trang: {str(e)}")
+
+    async def list_pages(self, db: AsyncSession, job_id: str = None, document_id: int = None) -> List[PageSummary]:
+        # Chỉ các cột nhỏ, không tải text OCR hay vùng/ô bảng
+        try:
+            if not job_id and document_id is None:
+                raise OCRError("Cần job_id hoặc document_id")
+
+            query = select(
+                Page.id, Page.document_id, Page.job_id, Page.source_page_number, Page.page_number,
+                Page.extraction_time, Page.width, Page.height, Page.confidence
+            )
+            if job_id:
+                query = query.where(Page.job_id == job_id)
+            if document_id is not None:
+                query = query.where(Page.document_id == document_id)
+
+            result = await db.execute(query.order_by(Page.source_page_number))
+            return [PageSummary(**row._mapping) for row in result]
+
+        except Exception as e:
+            self.logger.error(f"Lỗi khi lấy danh sách trang: {str(e)}")
+            raise OCRError(f"Không thể lấy danh sách trang: {str(e)}")
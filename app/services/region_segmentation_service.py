@@ -2,11 +2,20 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw
 
+from app.utils.page_image import PageImage
+
 class RegionSegmenter:
     def __init__(self, config):
         self.config = config['segmentation']
     
     def find_text_regions(self, binary_image):
+        page = None
+        if isinstance(binary_image, PageImage):
+            page = binary_image
+            binary_image = page.analysis
+        # Ngưỡng diện tích tính theo ảnh gốc
+        min_area = self.config['min_contour_area'] * (page.analysis_scale ** 2 if page is not None else 1)
+
         # Tìm contour
         contours, _ = cv2.findContours(
             binary_image,
@@ -22,17 +31,23 @@ class RegionSegmenter:
             aspect_ratio = w / float(h)
             
             # Lọc dựa trên diện tích và tỷ lệ khung
-            if (area >= self.config['min_contour_area'] and
+            if (area >= min_area and
                 self.config['min_aspect_ratio'] <= aspect_ratio <= self.config['max_aspect_ratio']):
                 text_regions.append((x, y, w, h))
         
         # Sắp xếp các vùng từ trên xuống dưới
         text_regions.sort(key=lambda r: r[1])
+
+        # Đổi về tọa độ ảnh gốc để cắt vùng OCR ở độ phân giải đầy đủ
+        if page is not None and page.analysis_scale < 1:
+            text_regions = [tuple(page.to_full(v) for v in region) for region in text_regions]
         
         return text_regions
     
     def draw_regions(self, image, regions):
-        if isinstance(image, np.ndarray):
+        if isinstance(image, PageImage):
+            image = image.pil
+        elif isinstance(image, np.ndarray):
             image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
         
         # Create a copy for drawing
@@ -50,6 +65,10 @@ class RegionSegmenter:
         return draw_image
     
     def extract_regions(self, image, regions):
+        # Với PageImage: trả về view trên mảng RGB của trang thay vì tạo ảnh PIL cho từng vùng
+        if isinstance(image, PageImage):
+            return [image.crop(region) for region in regions]
+
         if isinstance(image, np.ndarray):
             image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
         
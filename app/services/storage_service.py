@@ -1,44 +1,225 @@
 import io
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 from app.core.config import settings
 
-class StorageService:
-    def __init__(self):
-        self.client = Minio(
+
+class StorageBackend(ABC):
+    """
+    Giao diện lưu trữ object: MinIO, thư mục cục bộ hoặc bộ nhớ (dùng cho test/benchmark)
+    """
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    @abstractmethod
+    def put_object(self, object_name: str, data: bytes, content_type: str):
+        pass
+
+    @abstractmethod
+    def get_object(self, object_name: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def exists(self, object_name: str) -> bool:
+        pass
+
+    @abstractmethod
+    def url(self, object_name: str) -> str:
+        pass
+
+    def presigned_put_url(self, object_name: str, expires: timedelta):
+        # Backend không hỗ trợ upload trực tiếp trả về None, API sẽ cấp upload session
+        return None
+
+
+class MinioStorageBackend(StorageBackend):
+    def __init__(self, bucket):
+        super().__init__(bucket)
+        self._client = None
+        self._presign_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Chỉ kết nối MinIO ở lần sử dụng đầu tiên, không phải khi khởi tạo
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._connect()
+        return self._client
+
+    def _connect(self):
+        # Dùng chung một pool kết nối cho các upload song song
+        http_client = urllib3.PoolManager(
+            maxsize=settings.MINIO_MAX_POOL_SIZE,
+            timeout=urllib3.Timeout(
+                connect=settings.MINIO_CONNECT_TIMEOUT,
+                read=settings.MINIO_READ_TIMEOUT
+            ),
+            retries=urllib3.Retry(
+                total=settings.MINIO_MAX_RETRIES,
+                backoff_factor=settings.MINIO_RETRY_BACKOFF,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
+        client = Minio(
             settings.MINIO_ENDPOINT.replace('http://', '').replace('https://', ''),
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_ENDPOINT.startswith('https')
+            secure=settings.MINIO_ENDPOINT.startswith('https'),
+            region=settings.MINIO_REGION,
+            http_client=http_client
         )
-        self.bucket = settings.MINIO_BUCKET
         # Tạo bucket nếu chưa có
-        found = self.client.bucket_exists(self.bucket)
+        found = client.bucket_exists(self.bucket)
         if not found:
-            self.client.make_bucket(self.bucket)
+            client.make_bucket(self.bucket)
+        return client
 
-    def upload_file(self, file_data: bytes, object_name: str, content_type: str = 'application/octet-stream'):
+    def put_object(self, object_name: str, data: bytes, content_type: str):
         try:
             self.client.put_object(
                 self.bucket,
                 object_name,
-                io.BytesIO(file_data),
-                length=len(file_data),
+                io.BytesIO(data),
+                length=len(data),
                 content_type=content_type
             )
-            return self.get_file_url(object_name)
         except S3Error as e:
             raise Exception(f"MinIO upload error: {e}")
 
-    def get_file_url(self, object_name: str):
-        return f"{settings.MINIO_ENDPOINT}/{self.bucket}/{object_name}"
-
-    def download_file(self, object_name: str) -> bytes:
+    def get_object(self, object_name: str) -> bytes:
+        response = None
         try:
             response = self.client.get_object(self.bucket, object_name)
-            data = response.read()
-            response.close()
-            response.release_conn()
-            return data
+            return response.read()
         except S3Error as e:
-            raise Exception(f"MinIO download error: {e}") 
\ No newline at end of file
+            if e.code in ('NoSuchKey', 'NoSuchObject'):
+                raise FileNotFoundError(f"Không tìm thấy object: {object_name}")
+            raise Exception(f"MinIO download error: {e}")
+        finally:
+            if response is not None:
+                response.close()
+                response.release_conn()
+
+    def exists(self, object_name: str) -> bool:
+        try:
+            self.client.stat_object(self.bucket, object_name)
+            return True
+        except S3Error as e:
+            if e.code in ('NoSuchKey', 'NoSuchObject'):
+                return False
+            raise Exception(f"MinIO stat error: {e}")
+
+    def url(self, object_name: str) -> str:
+        return f"{settings.MINIO_ENDPOINT}/{self.bucket}/{object_name}"
+
+    def presigned_put_url(self, object_name: str, expires: timedelta):
+        # Chữ ký gắn với host nên URL phải được ký bằng endpoint mà client truy cập được
+        if self._presign_client is None:
+            endpoint = settings.MINIO_PUBLIC_ENDPOINT or settings.MINIO_ENDPOINT
+            self._presign_client = Minio(
+                endpoint.replace('http://', '').replace('https://', ''),
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=endpoint.startswith('https'),
+                region=settings.MINIO_REGION
+            )
+        return self._presign_client.presigned_put_object(self.bucket, object_name, expires=expires)
+
+
+class LocalStorageBackend(StorageBackend):
+    def __init__(self, bucket, root_dir):
+        super().__init__(bucket)
+        self.base_dir = os.path.abspath(os.path.join(root_dir, bucket))
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _path(self, object_name: str) -> str:
+        path = os.path.abspath(os.path.join(self.base_dir, object_name))
+        if not path.startswith(self.base_dir + os.sep):
+            raise ValueError(f"Tên object không hợp lệ: {object_name}")
+        return path
+
+    def put_object(self, object_name: str, data: bytes, content_type: str):
+        path = self._path(object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get_object(self, object_name: str) -> bytes:
+        path = self._path(object_name)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Không tìm thấy object: {object_name}")
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def exists(self, object_name: str) -> bool:
+        return os.path.isfile(self._path(object_name))
+
+    def url(self, object_name: str) -> str:
+        return f"file://{self._path(object_name)}"
+
+
+class InMemoryStorageBackend(StorageBackend):
+    def __init__(self, bucket):
+        super().__init__(bucket)
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, object_name: str, data: bytes, content_type: str):
+        with self._lock:
+            self._objects[object_name] = bytes(data)
+
+    def get_object(self, object_name: str) -> bytes:
+        with self._lock:
+            if object_name not in self._objects:
+                raise FileNotFoundError(f"Không tìm thấy object: {object_name}")
+            return self._objects[object_name]
+
+    def exists(self, object_name: str) -> bool:
+        with self._lock:
+            return object_name in self._objects
+
+    def url(self, object_name: str) -> str:
+        return f"memory://{self.bucket}/{object_name}"
+
+
+def create_storage_backend(name=None) -> StorageBackend:
+    name = (name or settings.STORAGE_BACKEND).lower()
+    if name == 'minio':
+        return MinioStorageBackend(settings.MINIO_BUCKET)
+    if name == 'local':
+        return LocalStorageBackend(settings.MINIO_BUCKET, settings.LOCAL_STORAGE_PATH)
+    if name == 'memory':
+        return InMemoryStorageBackend(settings.MINIO_BUCKET)
+    raise ValueError(f"Storage backend không hỗ trợ: {name}")
+
+
+class StorageService:
+    def __init__(self, backend: StorageBackend = None):
+        self.backend = backend or create_storage_backend()
+        self.bucket = self.backend.bucket
+
+    def upload_file(self, file_data: bytes, object_name: str, content_type: str = 'application/octet-stream'):
+        self.backend.put_object(object_name, file_data, content_type)
+        return self.get_file_url(object_name)
+
+    def object_exists(self, object_name: str) -> bool:
+        return self.backend.exists(object_name)
+
+    def get_file_url(self, object_name: str):
+        return self.backend.url(object_name)
+
+    def download_file(self, object_name: str) -> bytes:
+        return self.backend.get_object(object_name)
+
+    def presigned_upload_url(self, object_name: str, expires: timedelta):
+        return self.backend.presigned_put_url(object_name, expires)
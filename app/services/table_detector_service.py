@@ -1,17 +1,83 @@
+import time
+
 import cv2
 import numpy as np
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from app.utils.exceptions import ImageError
 from app.utils.logger import Logger
+from app.utils.page_image import PageImage
 
 
 class TableDetector:
     def __init__(self, config):
         self.logger = Logger(__name__).logger
         self.config = config['table_detection']
+        probe_config = config.get('table_probe', {})
+        self.probe_config = probe_config
+        self.probe_enabled = probe_config.get('enabled', True)
+        self.probe_scale = probe_config.get('scale', 0.25)
+        self.probe_ink_threshold = probe_config.get('ink_threshold', 230)
+        self.probe_length_ratio = probe_config.get('length_ratio', 0.8)
+        self.probe_min_lines = probe_config.get('min_lines', 2)
+        self._scaled_detectors = {}
+        self.reset_stats()
         self.logger.debug("Khởi tạo TableDetector với cấu hình: " + str(self.config))
 
+    def reset_stats(self):
+        # Thống kê theo trang: số trang bỏ qua nhờ dò nhanh và thời gian từng bước của bộ dò đầy đủ
+        self.stats = {
+            'pages': 0,
+            'skipped': 0,
+            'probe_time': 0.0,
+            'full_pages': 0,
+            'stage_time': {'lines': 0.0, 'components': 0.0, 'intersections': 0.0, 'grid': 0.0}
+        }
+
+    def stats_summary(self):
+        """
+        Tổng hợp thống kê: thời gian tiết kiệm mỗi bước được ước tính bằng thời gian trung bình
+        của bước đó trên các trang chạy bộ dò đầy đủ nhân với số trang bị bỏ qua.
+        """
+        stats = self.stats
+        full_pages = stats['full_pages']
+        saved = {
+            stage: (elapsed / full_pages * stats['skipped'] if full_pages else 0.0)
+            for stage, elapsed in stats['stage_time'].items()
+        }
+        return {
+            'pages': stats['pages'],
+            'skipped': stats['skipped'],
+            'probe_time': stats['probe_time'],
+            'stage_time': dict(stats['stage_time']),
+            'saved_time': saved,
+            'net_saved_time': sum(saved.values()) - stats['probe_time']
+        }
+
+    def _probe_tables(self, gray, page=None):
+        """
+        Dò nhanh trên ảnh thu nhỏ: chỉ chạy bộ dò đầy đủ khi trang có ít nhất min_lines
+        đường ngang và min_lines đường dọc đủ dài (chữ không tạo được đường dọc dài).
+        Ưu tiên không bỏ sót: ảnh nền xám hay nhiễu sẽ được coi là có thể có bảng.
+        """
+        scale = self.probe_scale
+        if page is not None:
+            small = page.downscaled(scale)
+        else:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        # INTER_AREA lấy trung bình nên đường kẻ mảnh chỉ làm pixel xám đi, không đen hẳn
+        ink = (small < self.probe_ink_threshold).astype(np.uint8)
+
+        h_length = max(2, int(self.config['horizontal_kernel_length'] * scale * self.probe_length_ratio))
+        v_length = max(2, int(self.config['vertical_kernel_length'] * scale * self.probe_length_ratio))
+        # Erode giữ lại các pixel nằm trong dải mực liên tục đủ dài
+        h_runs = cv2.erode(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (h_length, 1)))
+        v_runs = cv2.erode(ink, cv2.getStructuringElement(cv2.MORPH_RECT, (1, v_length)))
+
+        num_h = len(self._line_positions(h_runs.any(axis=1), 1))
+        num_v = len(self._line_positions(v_runs.any(axis=0), 1))
+        return num_h >= self.probe_min_lines and num_v >= self.probe_min_lines
+
     def _detect_lines(self, image):
         try:
             # Áp dụng threshold
@@ -50,147 +116,352 @@ class TableDetector:
             self.logger.error(f"Lỗi phát hiện đường kẻ: {str(e)}")
             raise ImageError("Lỗi phát hiện đường kẻ trong bảng")
 
+    def _snap_to_grid(self, values, threshold):
+        # Gom các tọa độ cách nhau < threshold trên một trục về giá trị trung bình của nhóm
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        groups = np.concatenate(([0], np.cumsum(np.diff(sorted_values) >= threshold)))
+        means = np.bincount(groups, weights=sorted_values) / np.bincount(groups)
+
+        snapped = np.empty_like(values, dtype=np.float64)
+        snapped[order] = means[groups]
+        return snapped
+
     def _find_intersections(self, h_lines, v_lines):
         try:
             # Kết hợp đường ngang và dọc
             joints = cv2.bitwise_and(h_lines, v_lines)
 
-            # Tìm tọa độ các điểm giao nhau
-            coords = np.column_stack(np.where(joints > 0))
+            # Mỗi vùng liên thông của điểm giao là một giao điểm, lấy tâm thay vì duyệt từng pixel
+            num_labels, _, _, centroids = cv2.connectedComponentsWithStats(joints, connectivity=8)
+            if num_labels <= 1:
+                return np.empty((0, 2))
 
-            # Gom nhóm các điểm gần nhau
-            intersections = []
-            for coord in coords:
-                added = False
-                for i, point in enumerate(intersections):
-                    if np.linalg.norm(coord - point) < self.config['intersection_threshold']:
-                        intersections[i] = (intersections[i] + coord) / 2
-                        added = True
-                        break
-                if not added:
-                    intersections.append(coord)
+            # centroids là (x, y), đổi về (hàng, cột) như trước
+            points = centroids[1:, ::-1]
 
-            return np.array(intersections)
+            # Gom các tâm gần nhau theo từng trục rồi bỏ trùng
+            threshold = self.config['intersection_threshold']
+            rows = self._snap_to_grid(points[:, 0], threshold)
+            cols = self._snap_to_grid(points[:, 1], threshold)
+            return np.unique(np.column_stack((rows, cols)), axis=0)
 
         except Exception as e:
             self.logger.error(f"Lỗi tìm điểm giao: {str(e)}")
             raise ImageError("Lỗi tìm điểm giao trong bảng")
 
-    def _extract_cells(self, image, intersections):
-        try:
-            # Sắp xếp các điểm theo hàng và cột
-            sorted_points = intersections[np.lexsort((intersections[:, 1], intersections[:, 0]))]
-
-            cells = []
-            for i in range(len(sorted_points) - 1):
-                for j in range(len(sorted_points) - 1):
-                    top_left = sorted_points[i]
-                    bottom_right = sorted_points[i + 1]
-
-                    # Trích xuất vùng ảnh của ô
-                    cell = image[
-                           int(top_left[0]):int(bottom_right[0]),
-                           int(top_left[1]):int(bottom_right[1])
-                           ]
-
-                    if cell.size > 0:  # Kiểm tra ô không rỗng
-                        cells.append({
-                            'image': cell,
-                            'position': (i, j),
-                            'bbox': (
-                                int(top_left[1]), int(top_left[0]),
-                                int(bottom_right[1]), int(bottom_right[0])
-                            )
-                        })
-
-            return cells
-
-        except Exception as e:
-            self.logger.error(f"Lỗi trích xuất ô: {str(e)}")
-            raise ImageError("Lỗi trích xuất ô trong bảng")
+    def _line_positions(self, projection, min_length):
+        # Vị trí (tâm) của các đường kẻ: các dải liên tiếp có đủ pixel đường kẻ
+        indexes = np.flatnonzero(projection >= min_length)
+        if indexes.size == 0:
+            return indexes
+        breaks = np.flatnonzero(np.diff(indexes) > 1)
+        starts = np.concatenate(([indexes[0]], indexes[breaks + 1]))
+        ends = np.concatenate((indexes[breaks], [indexes[-1]]))
+        return (starts + ends) // 2
+
+    def _boundary_coverage(self, lines, positions, spans, axis):
+        """
+        Tỷ lệ được kẻ của từng đoạn biên: với mỗi đường tại positions[k] và mỗi khoảng
+        (spans[i], spans[i + 1]) dọc theo đường đó. Trả về mảng (len(spans) - 1, len(positions)).
+        """
+        tolerance = max(1, self.config['intersection_threshold'] // 2)
+        coverage = np.zeros((len(spans) - 1, len(positions)))
+        lengths = np.diff(spans).clip(min=1)
+        for k, position in enumerate(positions):
+            low, high = max(0, position - tolerance), position + tolerance + 1
+            band = lines[:, low:high].any(axis=1) if axis == 1 else lines[low:high, :].any(axis=0)
+            cumulative = np.concatenate(([0], np.cumsum(band)))
+            coverage[:, k] = (cumulative[spans[1:]] - cumulative[spans[:-1]]) / lengths
+        return coverage
+
+    def _build_grid(self, h_lines, v_lines):
+        """
+        Dựng lưới hàng/cột của một bảng từ hình chiếu đường kẻ, gộp các ô không có
+        đường kẻ ngăn cách thành ô có row_span/col_span. Trả về (ys, xs, danh sách ô theo tọa độ bảng).
+        """
+        ys = self._line_positions((h_lines > 0).sum(axis=1), self.config['horizontal_kernel_length'])
+        xs = self._line_positions((v_lines > 0).sum(axis=0), self.config['vertical_kernel_length'])
+        if len(ys) < 2 or len(xs) < 2:
+            return ys, xs, []
+
+        rows, cols = len(ys) - 1, len(xs) - 1
+        # vertical[r, k]: đường dọc xs[k] có ngăn ô ở hàng r; horizontal[c, k]: đường ngang ys[k] ở cột c
+        vertical = self._boundary_coverage(v_lines, xs, ys, axis=1) >= 0.5
+        horizontal = self._boundary_coverage(h_lines, ys, xs, axis=0) >= 0.5
+
+        # Gộp các ô lân cận không có đường kẻ ngăn cách (union-find trên lưới)
+        parent = list(range(rows * cols))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for r in range(rows):
+            for c in range(cols):
+                if c + 1 < cols and not vertical[r, c + 1]:
+                    parent[find(r * cols + c + 1)] = find(r * cols + c)
+                if r + 1 < rows and not horizontal[c, r + 1]:
+                    parent[find((r + 1) * cols + c)] = find(r * cols + c)
+
+        groups = {}
+        for slot in range(rows * cols):
+            groups.setdefault(find(slot), set()).add(divmod(slot, cols))
+
+        cells = []
+        for group in groups.values():
+            cells.extend(self._group_rectangles(group))
+        return ys, xs, sorted(cells)
+
+    def _group_rectangles(self, group):
+        """
+        Chia một nhóm ô đã gộp thành các hình chữ nhật (r0, c0, r1, c1) không chồng nhau và phủ
+        đúng các ô của nhóm: nhóm hình chữ nhật giữ nguyên, nhóm hình L/răng cưa (đường kẻ đứt
+        một phần) được tách để mỗi ô lưới thuộc đúng một ô kết quả.
+        """
+        r0, c0 = min(r for r, _ in group), min(c for _, c in group)
+        r1, c1 = max(r for r, _ in group), max(c for _, c in group)
+        if len(group) == (r1 - r0 + 1) * (c1 - c0 + 1):
+            return [(r0, c0, r1, c1)]
+
+        # Tham lam theo hàng: lấy đoạn liên tiếp dài nhất bắt đầu từ ô chưa dùng, rồi kéo xuống
+        # các hàng dưới khi cả đoạn vẫn thuộc nhóm và chưa dùng
+        remaining = set(group)
+        rectangles = []
+        for r, c in sorted(group):
+            if (r, c) not in remaining:
+                continue
+            end = c
+            while (r, end + 1) in remaining:
+                end += 1
+            bottom = r
+            while all((bottom + 1, col) in remaining for col in range(c, end + 1)):
+                bottom += 1
+            for row in range(r, bottom + 1):
+                for col in range(c, end + 1):
+                    remaining.discard((row, col))
+            rectangles.append((r, c, bottom, end))
+        return rectangles
+
+    def _extract_table(self, image, h_lines, v_lines, offset, intersections):
+        x0, y0 = offset
+        ys, xs, slots = self._build_grid(h_lines, v_lines)
+        if not slots:
+            return None
+
+        cells = []
+        for r0, c0, r1, c1 in slots:
+            x1, y1, x2, y2 = x0 + int(xs[c0]), y0 + int(ys[r0]), x0 + int(xs[c1 + 1]), y0 + int(ys[r1 + 1])
+            if (x2 - x1) * (y2 - y1) < self.config['min_cell_area']:
+                continue
+            cells.append({
+                # Cắt view trên ảnh trang, không sao chép pixel
+                'image': image[y1:y2, x1:x2],
+                'position': (r0, c0),
+                'row_span': r1 - r0 + 1,
+                'col_span': c1 - c0 + 1,
+                'bbox': (x1, y1, x2, y2)
+            })
+
+        height, width = h_lines.shape
+        return {
+            'bbox': (x0, y0, x0 + width, y0 + height),
+            'cells': cells,
+            'num_rows': len(ys) - 1,
+            'num_cols': len(xs) - 1,
+            'row_boundaries': [y0 + int(y) for y in ys],
+            'col_boundaries': [x0 + int(x) for x in xs],
+            'intersections': intersections.tolist()
+        }
 
     def detect_tables(self, image):
         self.logger.info("Bắt đầu phát hiện bảng")
         try:
             # Chuyển đổi ảnh sang grayscale nếu cần
-            if isinstance(image, Image.Image):
+            page = None
+            if isinstance(image, PageImage):
+                page = image
+                image = page.analysis
+            elif isinstance(image, Image.Image):
                 image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
             if len(image.shape) == 3:
                 gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             else:
                 gray = image
 
-            # Phát hiện đường kẻ
-            h_lines, v_lines = self._detect_lines(gray)
-
-            # Tìm các điểm giao nhau
-            intersections = self._find_intersections(h_lines, v_lines)
-
-            if len(intersections) < 4:  # Cần ít nhất 4 điểm để tạo thành bảng
-                self.logger.warning("Không phát hiện được bảng")
+            scale = page.analysis_scale if page is not None else 1.0
+            if scale < 1:
+                # Dò trên ảnh độ phân giải phân tích với tham số thu nhỏ theo, rồi đổi hình học về ảnh gốc
+                detector = self._scaled_detector(scale)
+                detector.stats = self.stats
+                tables = [self._scale_table(table, page, page.detail) for table in detector._detect(gray, page)]
+            else:
+                tables = self._detect(gray, page)
+            if not tables:
                 return []
 
-            # Trích xuất các ô trong bảng
-            cells = self._extract_cells(gray, intersections)
-
-            # Tạo thông tin về bảng
-            table_info = {
-                'cells': cells,
-                'num_rows': len(set(cell['position'][0] for cell in cells)),
-                'num_cols': len(set(cell['position'][1] for cell in cells)),
-                'intersections': intersections.tolist()
-            }
-
-            self.logger.info(f"Đã phát hiện bảng với {len(cells)} ô")
-            return [table_info]  # Trả về list để hỗ trợ nhiều bảng trong tương lai
+            # Thứ tự đọc: trên xuống dưới, trái sang phải
+            tables.sort(key=lambda t: (t['bbox'][1], t['bbox'][0]))
+            self.logger.info(
+                f"Đã phát hiện {len(tables)} bảng với {sum(len(t['cells']) for t in tables)} ô"
+            )
+            return tables
 
         except Exception as e:
             self.logger.error(f"Lỗi phát hiện bảng: {str(e)}")
             raise ImageError("Lỗi phát hiện bảng trong ảnh")
 
-    def draw_table_boundaries(self, image, table_info):
+    def _scaled_detector(self, scale):
+        # Độ dài (kernel, ngưỡng gom điểm) nhân theo scale, diện tích nhân theo scale^2
+        if scale not in self._scaled_detectors:
+            config = dict(self.config)
+            for key in ('horizontal_kernel_length', 'vertical_kernel_length', 'intersection_threshold'):
+                config[key] = max(1, int(round(config[key] * scale)))
+            for key in ('min_table_area', 'min_cell_area'):
+                config[key] = config[key] * scale * scale
+            self._scaled_detectors[scale] = TableDetector({'table_detection': config, 'table_probe': self.probe_config})
+        return self._scaled_detectors[scale]
+
+    def _scale_table(self, table, page, image):
+        # Đổi tọa độ bảng về ảnh gốc và cắt lại ảnh ô trên image (độ phân giải đầy đủ)
+        scale = page.to_full
+
+        cells = []
+        for cell in table['cells']:
+            x1, y1, x2, y2 = (scale(v) for v in cell['bbox'])
+            cells.append(dict(cell, bbox=(x1, y1, x2, y2), image=image[y1:y2, x1:x2]))
+
+        return dict(
+            table,
+            bbox=tuple(scale(v) for v in table['bbox']),
+            cells=cells,
+            row_boundaries=[scale(v) for v in table['row_boundaries']],
+            col_boundaries=[scale(v) for v in table['col_boundaries']],
+            intersections=(np.asarray(table['intersections']) / page.analysis_scale).tolist()
+        )
+
+    def _detect(self, gray, page=None):
+        self.stats['pages'] += 1
+        if self.probe_enabled:
+            start = time.perf_counter()
+            candidate = self._probe_tables(gray, page)
+            self.stats['probe_time'] += time.perf_counter() - start
+            if not candidate:
+                self.stats['skipped'] += 1
+                self.logger.info("Trang không có đường kẻ dạng bảng, bỏ qua bước phát hiện bảng đầy đủ")
+                return []
+
+        stage_time = self.stats['stage_time']
+        self.stats['full_pages'] += 1
+
+        # Phát hiện đường kẻ
+        start = time.perf_counter()
+        h_lines, v_lines = self._detect_lines(gray)
+        stage_time['lines'] += time.perf_counter() - start
+
+        # Mỗi vùng liên thông của lưới đường kẻ là một bảng
+        start = time.perf_counter()
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
+            cv2.bitwise_or(h_lines, v_lines), connectivity=8
+        )
+        stage_time['components'] += time.perf_counter() - start
+
+        tables = []
+        for label in range(1, num_labels):
+            x, y, w, h, _ = stats[label]
+            if w * h < self.config['min_table_area']:
+                continue
+
+            start = time.perf_counter()
+            component = labels[y:y + h, x:x + w] == label
+            table_h = np.where(component, h_lines[y:y + h, x:x + w], 0)
+            table_v = np.where(component, v_lines[y:y + h, x:x + w], 0)
+            stage_time['components'] += time.perf_counter() - start
+
+            # Cần ít nhất 4 điểm giao để tạo thành bảng
+            start = time.perf_counter()
+            intersections = self._find_intersections(table_h, table_v)
+            stage_time['intersections'] += time.perf_counter() - start
+            if len(intersections) < 4:
+                continue
+            intersections = intersections + (y, x)
+
+            start = time.perf_counter()
+            table_info = self._extract_table(gray, table_h, table_v, (int(x), int(y)), intersections)
+            stage_time['grid'] += time.perf_counter() - start
+            if table_info and table_info['cells']:
+                tables.append(table_info)
+
+        if not tables:
+            self.logger.warning("Không phát hiện được bảng")
+        return tables
+
+    def _edge_runs(self, edges):
+        # Các đoạn liên tiếp True trên từng hàng của edges: (chỉ số hàng, đầu, cuối không tính)
+        padded = np.pad(edges, ((0, 0), (1, 1))).astype(np.int8)
+        steps = np.diff(padded, axis=1)
+        boundaries, starts = np.nonzero(steps == 1)
+        _, ends = np.nonzero(steps == -1)
+        return boundaries, starts, ends
+
+    def _table_segments(self, table_info):
+        """
+        Các đoạn thẳng (N, 2, 2) theo (x, y) cần vẽ cho một bảng: mỗi đường biên của lưới
+        được nối thành một đoạn cho mỗi khúc liên tục là cạnh ô (ô gộp không có đường bên trong).
+        Bảng lưu từ phiên bản cũ (không có row/col_boundaries) thì vẽ khung từng ô.
+        """
+        cells = table_info.get('cells', [])
+        if not table_info.get('row_boundaries') or not table_info.get('col_boundaries'):
+            boxes = np.array([cell['bbox'] for cell in cells], dtype=np.int32).reshape(-1, 4)
+            x1, y1, x2, y2 = boxes.T
+            top = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1)], 1)
+            bottom = np.stack([np.stack([x1, y2], 1), np.stack([x2, y2], 1)], 1)
+            left = np.stack([np.stack([x1, y1], 1), np.stack([x1, y2], 1)], 1)
+            right = np.stack([np.stack([x2, y1], 1), np.stack([x2, y2], 1)], 1)
+            return np.concatenate([top, bottom, left, right])
+
+        ys = np.asarray(table_info['row_boundaries'], dtype=np.int32)
+        xs = np.asarray(table_info['col_boundaries'], dtype=np.int32)
+        rows, cols = len(ys) - 1, len(xs) - 1
+        # h_edges[k, c]: đường ngang ys[k] là cạnh ô tại cột c; v_edges[k, r]: đường dọc xs[k] tại hàng r
+        h_edges = np.zeros((rows + 1, cols), dtype=bool)
+        v_edges = np.zeros((cols + 1, rows), dtype=bool)
+        for cell in cells:
+            r, c = cell['position']
+            r1, c1 = r + cell.get('row_span', 1), c + cell.get('col_span', 1)
+            h_edges[[r, r1], c:c1] = True
+            v_edges[[c, c1], r:r1] = True
+
+        k, start, end = self._edge_runs(h_edges)
+        horizontal = np.stack([np.stack([xs[start], ys[k]], 1), np.stack([xs[end], ys[k]], 1)], 1)
+        k, start, end = self._edge_runs(v_edges)
+        vertical = np.stack([np.stack([xs[k], ys[start]], 1), np.stack([xs[k], ys[end]], 1)], 1)
+        return np.concatenate([horizontal, vertical])
+
+    def draw_tables(self, image, tables, color=(0, 0, 255), width=2):
+        """
+        Vẽ khung tất cả các bảng của trang bằng một lần gọi cv2.polylines trên mảng RGB.
+        Trả về ảnh PIL mới, không sửa ảnh đầu vào.
+        """
         try:
-            # Chuyển đổi sang PIL Image nếu cần
             if isinstance(image, np.ndarray):
-                image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-
-            draw_image = image.copy()
-            draw = ImageDraw.Draw(draw_image)
-
-            # Vẽ các ô
-            for cell in table_info['cells']:
-                bbox = cell['bbox']
-                draw.rectangle(
-                    [(bbox[0], bbox[1]), (bbox[2], bbox[3])],
-                    outline='blue',
-                    width=2
-                )
-
-            # Vẽ các đường nối giữa các ô
-            if 'intersections' in table_info:
-                points = np.array(table_info['intersections'])
-                for i in range(len(points)):
-                    for j in range(i + 1, len(points)):
-                        # Vẽ đường ngang nếu cùng hàng
-                        if abs(points[i][0] - points[j][0]) < 5:
-                            draw.line(
-                                [(points[i][1], points[i][0]),
-                                 (points[j][1], points[j][0])],
-                                fill='blue',
-                                width=1
-                            )
-                        # Vẽ đường dọc nếu cùng cột
-                        if abs(points[i][1] - points[j][1]) < 5:
-                            draw.line(
-                                [(points[i][1], points[i][0]),
-                                 (points[j][1], points[j][0])],
-                                fill='blue',
-                                width=1
-                            )
-
-            self.logger.info("Đã vẽ khung bảng thành công")
-            return draw_image
+                canvas = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            else:
+                canvas = np.array(image.convert('RGB'))
+
+            segments = [self._table_segments(table) for table in tables]
+            segments = np.concatenate(segments) if segments else np.empty((0, 2, 2), dtype=np.int32)
+            if len(segments):
+                cv2.polylines(canvas, list(segments.astype(np.int32)), False, color, width)
+
+            self.logger.info(f"Đã vẽ khung {len(tables)} bảng ({len(segments)} đoạn)")
+            return Image.fromarray(canvas)
 
         except Exception as e:
             self.logger.error(f"Lỗi vẽ khung bảng: {str(e)}")
             return image
+
+    def draw_table_boundaries(self, image, table_info):
+        return self.draw_tables(image, [table_info])
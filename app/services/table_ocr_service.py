@@ -0,0 +1,142 @@
+import cv2
+import numpy as np
+
+from app.utils.logger import Logger
+from app.utils.table_export import table_grid
+
+
+class TableOCR:
+    """
+    OCR nội dung các ô bảng: gom tất cả ô có chữ của một trang thành một lô gửi vào
+    process pool của OCRModule, bỏ qua ô trống (không có nét chữ nào đủ lớn).
+    """
+
+    def __init__(self, config, ocr):
+        self.logger = Logger(__name__).logger
+        self.ocr = ocr
+        table_ocr_config = config.get('table_ocr', {})
+        self.enabled = table_ocr_config.get('enabled', True)
+        # Ngưỡng tuyệt đối (pixel) để ô lớn có ít chữ không bị coi là ô trống
+        self.min_ink_pixels = table_ocr_config.get('min_ink_pixels', 40)
+        self.min_component_area = table_ocr_config.get('min_component_area', 10)
+        self.cell_padding = table_ocr_config.get('cell_padding', 4)
+        self.exclude_table_regions = table_ocr_config.get('exclude_table_regions', True)
+        self.region_overlap_ratio = table_ocr_config.get('region_overlap_ratio', 0.5)
+        self.min_region_area = table_ocr_config.get('min_region_area', 1000)
+
+    def _cell_content(self, cell):
+        # Bỏ viền kẻ quanh ô để đường kẻ không bị tính là mực
+        image = cell['image']
+        pad = self.cell_padding
+        if image.shape[0] <= 2 * pad or image.shape[1] <= 2 * pad:
+            return None
+        content = image[pad:-pad, pad:-pad]
+        ink = (content < 128).astype(np.uint8)
+        if np.count_nonzero(ink) < self.min_ink_pixels:
+            return None
+
+        # Đếm mực theo thành phần liên thông: bỏ đốm nhiễu nhỏ và phần đường kẻ còn sót ở mép ô
+        height, width = ink.shape
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        ink_pixels = 0
+        for x, y, w, h, area in stats[1:count]:
+            if area < self.min_component_area:
+                continue
+            touches_edge = x == 0 or y == 0 or x + w == width or y + h == height
+            line_like = (w >= width / 2 and h <= 2 * pad) or (h >= height / 2 and w <= 2 * pad)
+            if touches_edge and line_like:
+                continue
+            ink_pixels += area
+        return content if ink_pixels >= self.min_ink_pixels else None
+
+    def recognize_tables(self, tables, page_image=None):
+        """
+        Gắn 'text'/'confidence' vào từng ô và 'rows' (lưới text) vào từng bảng.
+        page_image là ảnh đã dùng để phát hiện bảng; nếu có, worker OCR đọc ô qua shared memory.
+        Trả về (số ô đã OCR, số ô trống bị bỏ qua).
+        """
+        batch, bboxes, targets = [], [], []
+        pad = self.cell_padding
+        skipped = 0
+        for table in tables:
+            for cell in table['cells']:
+                content = self._cell_content(cell)
+                if content is None:
+                    cell['text'], cell['confidence'] = '', None
+                    skipped += 1
+                else:
+                    x1, y1, x2, y2 = cell['bbox']
+                    batch.append(content)
+                    bboxes.append((x1 + pad, y1 + pad, x2 - x1 - 2 * pad, y2 - y1 - 2 * pad))
+                    targets.append(cell)
+
+        if batch:
+            if page_image is not None:
+                results = self.ocr.recognize_shared(page_image, bboxes)
+            else:
+                results = self.ocr.recognize_regions(batch)
+            for cell, result in zip(targets, results):
+                cell['text'] = result['text']
+                cell['confidence'] = result['confidence']
+
+        for table in tables:
+            table['rows'] = table_grid(table['cells'], table['num_rows'], table['num_cols'])
+
+        self.logger.info(f"OCR {len(batch)} ô bảng, bỏ qua {skipped} ô trống")
+        return len(batch), skipped
+
+    def _subtract(self, region, bbox):
+        # Phần của region (x, y, w, h) nằm ngoài bbox (x1, y1, x2, y2): dải trên, dải dưới, hai bên
+        x, y, w, h = region
+        tx1, ty1, tx2, ty2 = bbox
+        x2, y2 = x + w, y + h
+        if tx1 >= x2 or tx2 <= x or ty1 >= y2 or ty2 <= y:
+            return [region]
+
+        pieces = []
+        if ty1 > y:
+            pieces.append((x, y, w, ty1 - y))
+        if ty2 < y2:
+            pieces.append((x, ty2, w, y2 - ty2))
+        top, bottom = max(y, ty1), min(y2, ty2)
+        if tx1 > x:
+            pieces.append((x, top, tx1 - x, bottom - top))
+        if tx2 < x2:
+            pieces.append((tx2, top, x2 - tx2, bottom - top))
+        return pieces
+
+    def exclude_regions(self, regions, tables):
+        """
+        Cắt phần bảng khỏi các vùng văn bản để pixel trong bảng không bị OCR hai lần
+        (chỉ khi bảng được OCR riêng). Vùng nằm phần lớn trong bảng bị bỏ hẳn; vùng còn lại
+        được tách thành các phần ngoài bảng, bỏ các phần nhỏ hơn min_region_area.
+        """
+        if not self.enabled or not self.exclude_table_regions or not tables:
+            return regions
+
+        kept = []
+        for x, y, w, h in regions:
+            area = max(w * h, 1)
+            inside = 0
+            for table in tables:
+                tx1, ty1, tx2, ty2 = table['bbox']
+                overlap_w = min(x + w, tx2) - max(x, tx1)
+                overlap_h = min(y + h, ty2) - max(y, ty1)
+                if overlap_w > 0 and overlap_h > 0:
+                    inside += overlap_w * overlap_h
+            if inside / area >= self.region_overlap_ratio:
+                continue
+
+            pieces = [(x, y, w, h)]
+            for table in tables:
+                pieces = [piece for region in pieces for piece in self._subtract(region, table['bbox'])]
+            kept.extend(piece for piece in pieces if piece[2] * piece[3] >= self.min_region_area)
+
+        # Giữ thứ tự từ trên xuống như find_text_regions
+        kept.sort(key=lambda r: r[1])
+        return kept
+
+    def table_text(self, table):
+        # Text của bảng đưa vào nội dung trang: mỗi hàng một dòng, các ô cách nhau bằng tab
+        lines = ['\t'.join(row) for row in table.get('rows', [])]
+        return '\n'.join(line for line in lines if line.strip())
@@ -0,0 +1,145 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import unquote_plus
+
+from app.core.config import settings
+from app.utils.exceptions import AuthenticationError, ValidationError
+from app.utils.logger import Logger
+from app.utils.validation import Validator
+
+
+class UploadService:
+    """
+    Cấp URL upload trực tiếp lên storage để file lớn không phải đi qua API.
+    Với backend không hỗ trợ presigned URL (local/memory), API cấp một upload session
+    được ký HMAC nên mọi worker đều xác thực được mà không cần lưu trạng thái.
+    """
+
+    # Tách khỏi input/ (file upload qua API) để webhook không xử lý lại các file đó
+    INPUT_PREFIX = 'uploads/'
+
+    def __init__(self, storage):
+        self.logger = Logger(__name__).logger
+        self.storage = storage
+        self.expires = timedelta(seconds=settings.UPLOAD_URL_EXPIRES_SECONDS)
+        self._key = settings.UPLOAD_SIGNING_KEY.encode('utf-8')
+        # Object đang chờ/đang OCR từ webhook, để event lặp lại không xếp thêm job
+        self._pending_objects = set()
+
+    def _object_name(self, filename):
+        filename = os.path.basename(filename or '')
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in Validator.ALLOWED_EXTENSIONS:
+            raise ValidationError(f"Không hỗ trợ định dạng file {ext}", filename)
+        safe_name = re.sub(r'[^\w.-]', '_', filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"{self.INPUT_PREFIX}{timestamp}_{uuid.uuid4().hex[:8]}_{safe_name}"
+
+    def verify_webhook(self, authorization):
+        token = settings.STORAGE_WEBHOOK_TOKEN
+        if not token:
+            raise AuthenticationError("Webhook storage chưa được cấu hình STORAGE_WEBHOOK_TOKEN")
+        # MinIO gửi token nguyên bản hoặc dạng "Bearer <token>"
+        value = (authorization or '').strip()
+        if value.lower().startswith('bearer '):
+            value = value[7:].strip()
+        if not hmac.compare_digest(value.encode('utf-8'), token.encode('utf-8')):
+            raise AuthenticationError("Token webhook không hợp lệ")
+
+    def select_event_objects(self, records):
+        """
+        Lọc các record s3:ObjectCreated dưới uploads/: bỏ trùng trong cùng request và với các
+        object đang chờ xử lý, tối đa STORAGE_EVENT_MAX_RECORDS object mỗi request.
+        Trả về (accepted, ignored); các object accepted được đánh dấu đang chờ.
+        """
+        accepted, ignored = [], []
+        for record in records:
+            key = unquote_plus(record.get('s3', {}).get('object', {}).get('key', ''))
+            if (not record.get('eventName', '').startswith('s3:ObjectCreated')
+                    or not key.startswith(self.INPUT_PREFIX)
+                    or key in self._pending_objects
+                    or len(accepted) >= settings.STORAGE_EVENT_MAX_RECORDS):
+                ignored.append(key)
+                continue
+            self._pending_objects.add(key)
+            accepted.append(key)
+        return accepted, ignored
+
+    def release_event_object(self, key):
+        self._pending_objects.discard(key)
+
+    def _sign(self, payload: bytes) -> str:
+        return hmac.new(self._key, payload, hashlib.sha256).hexdigest()
+
+    def create_session(self, filename, content_type='application/octet-stream'):
+        object_name = self._object_name(filename)
+        expires_at = datetime.now() + self.expires
+
+        upload_url = self.storage.presigned_upload_url(object_name, self.expires)
+        if upload_url:
+            upload_id = None
+        else:
+            if not self._key:
+                raise ValidationError("Chưa cấu hình UPLOAD_SIGNING_KEY cho upload session")
+            # Upload session thay thế cho presigned URL khi chạy với storage cục bộ
+            payload = json.dumps({
+                'object_name': object_name,
+                'content_type': content_type,
+                'expires': int(time.time() + self.expires.total_seconds())
+            }, separators=(',', ':')).encode('utf-8')
+            upload_id = f"{base64.urlsafe_b64encode(payload).decode('ascii')}.{self._sign(payload)}"
+            upload_url = None
+
+        self.logger.info(f"Đã cấp upload cho object: {object_name}")
+        return {
+            'object_name': object_name,
+            'upload_id': upload_id,
+            'upload_url': upload_url,
+            'method': 'PUT',
+            'headers': {'Content-Type': content_type},
+            'expires_at': expires_at
+        }
+
+    def verify_session(self, upload_id):
+        if not self._key:
+            raise ValidationError("Upload session không hợp lệ")
+        try:
+            encoded, signature = upload_id.rsplit('.', 1)
+            payload = base64.urlsafe_b64decode(encoded.encode('ascii'))
+        except Exception:
+            raise ValidationError("Upload session không hợp lệ")
+
+        if not hmac.compare_digest(self._sign(payload), signature):
+            raise ValidationError("Upload session không hợp lệ")
+
+        session = json.loads(payload)
+        if session['expires'] < time.time():
+            raise ValidationError("Upload session đã hết hạn")
+        return session
+
+    async def accept_upload(self, upload_id, chunks):
+        session = self.verify_session(upload_id)
+
+        data = bytearray()
+        async for chunk in chunks:
+            data.extend(chunk)
+            if len(data) > settings.UPLOAD_MAX_SIZE:
+                raise ValidationError(f"File quá lớn: vượt {settings.UPLOAD_MAX_SIZE} bytes")
+
+        self.storage.upload_file(bytes(data), session['object_name'], session['content_type'])
+        self.logger.info(f"Đã nhận upload {len(data)} bytes cho object: {session['object_name']}")
+        return session['object_name']
+
+    def validate_object_name(self, object_name):
+        if not object_name.startswith(self.INPUT_PREFIX) or '..' in object_name.split('/'):
+            raise ValidationError(f"Object không hợp lệ: {object_name}", object_name)
+        if not self.storage.object_exists(object_name):
+            raise ValidationError(f"Không tìm thấy object: {object_name}", object_name)
+        return object_name
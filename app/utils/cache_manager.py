@@ -4,6 +4,8 @@ import hashlib
 import pickle
 from datetime import datetime, timedelta
 
+import numpy as np
+
 from app.utils.logger import Logger
 
 
@@ -23,6 +25,17 @@ class CacheManager:
 
     def generate_key(self, image):
         try:
+            if isinstance(image, np.ndarray):
+                # Băm trực tiếp trên bộ nhớ của mảng; view không liên tục (vùng cắt) được băm
+                # từng hàng, cho cùng kết quả với tobytes() mà không sao chép cả vùng
+                hash_object = hashlib.sha256()
+                if image.flags.c_contiguous:
+                    hash_object.update(image)
+                else:
+                    for row in image:
+                        hash_object.update(np.ascontiguousarray(row))
+                return hash_object.hexdigest()
+
             # Chuyển ảnh thành bytes
             if hasattr(image, 'tobytes'):
                 image_bytes = image.tobytes()
@@ -0,0 +1,19 @@
+import re
+
+
+class SelectiveCompressionMiddleware:
+    """
+    Bọc middleware nén (gzip/brotli): các đường dẫn khớp exclude_paths đi thẳng vào ứng dụng,
+    không nén. Dùng cho response stream lớn hoặc đã nén sẵn (export NDJSON/CSV/Parquet, ảnh JPEG).
+    """
+
+    def __init__(self, app, compressor, exclude_paths=(), **options):
+        self.app = app
+        self.compressed_app = compressor(app, **options)
+        self.exclude = [re.compile(pattern) for pattern in exclude_paths]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and any(pattern.search(scope['path']) for pattern in self.exclude):
+            await self.app(scope, receive, send)
+            return
+        await self.compressed_app(scope, receive, send)
@@ -37,4 +37,13 @@ class ExtractionError(OCRError):
 class CacheError(OCRError):
     def __init__(self, message, cache_key=None):
         super().__init__(message, error_code='CACHE_ERROR')
-        self.cache_key = cache_key
\ No newline at end of file
+        self.cache_key = cache_key
+
+class ConflictError(OCRError):
+    def __init__(self, message, resource_id=None):
+        super().__init__(message, error_code='CONFLICT')
+        self.resource_id = resource_id
+
+class AuthenticationError(OCRError):
+    def __init__(self, message):
+        super().__init__(message, error_code='UNAUTHORIZED')
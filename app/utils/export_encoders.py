@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+
+from app.utils.exceptions import ValidationError
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class ExportEncoder(ABC):
+    """
+    Mã hóa từng lô dòng (dict) thành bytes để stream ra response/file, không giữ cả bảng trong bộ nhớ.
+    """
+
+    content_type = 'application/octet-stream'
+    extension = 'bin'
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+    def header(self) -> bytes:
+        return b''
+
+    @abstractmethod
+    def encode_batch(self, rows) -> bytes:
+        pass
+
+    def footer(self) -> bytes:
+        return b''
+
+
+class NdjsonEncoder(ExportEncoder):
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def encode_batch(self, rows) -> bytes:
+        lines = [json.dumps(row, ensure_ascii=False, default=_json_default) for row in rows]
+        return ('\n'.join(lines) + '\n').encode('utf-8') if lines else b''
+
+
+class CsvEncoder(ExportEncoder):
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def _write(self, rows) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def _cell(self, value):
+        if value is None:
+            return ''
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def header(self) -> bytes:
+        # BOM để Excel đọc đúng tiếng Việt
+        return '\ufeff'.encode('utf-8') + self._write([self.columns])
+
+    def encode_batch(self, rows) -> bytes:
+        return self._write([[self._cell(row.get(column)) for column in self.columns] for row in rows])
+
+
+class _StreamBuffer(io.RawIOBase):
+    # File-like cho ParquetWriter: giữ vị trí ghi tuyệt đối nhưng trả dữ liệu ra sau mỗi row group
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ParquetEncoder(ExportEncoder):
+    content_type = 'application/vnd.apache.parquet'
+    extension = 'parquet'
+
+    def __init__(self, columns, column_types):
+        super().__init__(columns)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValidationError("Xuất Parquet cần cài đặt pyarrow", 'parquet')
+
+        types = {
+            'int': pa.int64(),
+            'float': pa.float64(),
+            'str': pa.string(),
+            'datetime': pa.timestamp('us'),
+            'int_list': pa.list_(pa.int64()),
+        }
+        self._pa = pa
+        self._schema = pa.schema([(column, types[column_types[column]]) for column in self.columns])
+        self._buffer = _StreamBuffer()
+        self._writer = pq.ParquetWriter(self._buffer, self._schema, compression='snappy')
+
+    def encode_batch(self, rows) -> bytes:
+        # Mỗi lô là một row group
+        if not rows:
+            return b''
+        table = self._pa.Table.from_pylist(rows, schema=self._schema)
+        self._writer.write_table(table)
+        return self._buffer.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._buffer.drain()
+
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+
+
+def create_export_encoder(export_format, columns, column_types):
+    if export_format == 'ndjson':
+        return NdjsonEncoder(columns)
+    if export_format == 'csv':
+        return CsvEncoder(columns)
+    if export_format == 'parquet':
+        return ParquetEncoder(columns, column_types)
+    raise ValidationError(f"Định dạng xuất không hợp lệ: {export_format}", export_format)
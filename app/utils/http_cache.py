@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def make_etag(resource_id, updated_at: datetime) -> str:
+    # Weak ETag: đủ để xác thực lại, không cam kết giống từng byte (nén gzip/brotli)
+    return f'W/"{resource_id}-{int(updated_at.timestamp() * 1000000)}"'
+
+
+def http_date(value: datetime) -> str:
+    # Thời gian lưu trong DB là giờ địa phương không kèm múi giờ
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _strip_weak(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(headers, etag: str, updated_at: datetime) -> bool:
+    """
+    Kiểm tra If-None-Match (ưu tiên) rồi If-Modified-Since theo RFC 9110
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        current = _strip_weak(etag)
+        return any(_strip_weak(tag) == current for tag in if_none_match.split(','))
+
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP-date chỉ chính xác đến giây
+        return updated_at.astimezone(timezone.utc).replace(microsecond=0) <= since
+    return False
+
+
+class ResponseCache:
+    """
+    Cache LRU trong tiến trình cho body JSON đã serialize, khóa theo id và ETag.
+    Luôn so ETag với DB trước khi dùng nên các worker khác sửa dữ liệu cũng không trả bản cũ.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key, etag):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, etag, body: bytes):
+        if not self.enabled:
+            return
+        self._entries[key] = (etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
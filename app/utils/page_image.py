@@ -0,0 +1,123 @@
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class PageImage:
+    """
+    Ảnh của một trang dùng chung cho mọi bước xử lý. Mỗi biểu diễn (PIL, RGB, BGR, xám,
+    nhị phân, thu nhỏ) chỉ được tính một lần khi cần và được giữ lại cho các bước sau.
+    Mảng numpy trả về dùng chung, không được sửa tại chỗ.
+
+    analysis_scale < 1: tiền xử lý, tìm vùng và dò bảng chạy trên ảnh thu nhỏ, còn OCR và
+    cắt ô bảng vẫn dùng ảnh gốc (tọa độ được đổi về ảnh gốc bằng to_full).
+    """
+
+    def __init__(self, image, analysis_scale=1.0):
+        self.analysis_scale = analysis_scale
+        if isinstance(image, Image.Image):
+            self._source = 'pil'
+        elif image.ndim == 2:
+            self._source = 'gray'
+        else:
+            # Quy ước của OpenCV trong repo: ảnh màu dạng numpy là BGR
+            self._source = 'bgr'
+        self._cache = {self._source: image}
+
+    def _get(self, name, factory):
+        if name not in self._cache:
+            self._cache[name] = factory()
+        return self._cache[name]
+
+    @property
+    def pil(self):
+        return self._get('pil', lambda: Image.fromarray(self.gray if self._source == 'gray' else self.rgb))
+
+    @property
+    def rgb(self):
+        def build():
+            if self._source == 'pil':
+                pil = self._cache['pil']
+                return np.asarray(pil if pil.mode == 'RGB' else pil.convert('RGB'))
+            if self._source == 'bgr':
+                return cv2.cvtColor(self._cache['bgr'], cv2.COLOR_BGR2RGB)
+            return cv2.cvtColor(self._cache['gray'], cv2.COLOR_GRAY2RGB)
+        return self._get('rgb', build)
+
+    @property
+    def bgr(self):
+        return self._get('bgr', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR))
+
+    @property
+    def gray(self):
+        def build():
+            # Đi thẳng sang ảnh xám, không qua mảng RGB/BGR trung gian
+            if self._source == 'pil':
+                pil = self._cache['pil']
+                return np.asarray(pil if pil.mode == 'L' else pil.convert('L'))
+            return cv2.cvtColor(self._cache['bgr'], cv2.COLOR_BGR2GRAY)
+        return self._get('gray', build)
+
+    @property
+    def analysis_gray(self):
+        # Ảnh xám ở độ phân giải phân tích
+        if self.analysis_scale >= 1:
+            return self.gray
+        return self._get('analysis_gray', lambda: cv2.resize(
+            self.gray, None, fx=self.analysis_scale, fy=self.analysis_scale, interpolation=cv2.INTER_AREA
+        ))
+
+    @property
+    def binary(self):
+        # Ảnh nhị phân (độ phân giải phân tích) do ImagePreprocessor gán, None nếu chưa tiền xử lý
+        return self._cache.get('binary')
+
+    @binary.setter
+    def binary(self, value):
+        self._cache['binary'] = value
+        self.release('downscaled')
+
+    @property
+    def analysis(self):
+        # Ảnh dùng để phân tích bố cục: nhị phân nếu đã có, nếu không thì ảnh xám
+        return self.binary if self.binary is not None else self.analysis_gray
+
+    @property
+    def detail(self):
+        # Ảnh độ phân giải gốc để cắt ô bảng: ảnh nhị phân nếu phân tích ở độ phân giải gốc, nếu không là ảnh xám
+        return self.analysis if self.analysis_scale >= 1 else self.gray
+
+    def to_full(self, value):
+        # Đổi tọa độ/độ dài ở độ phân giải phân tích về ảnh gốc
+        return int(round(value / self.analysis_scale))
+
+    @property
+    def is_grayscale(self):
+        # Ảnh nguồn chỉ có một kênh (ví dụ PDF raster ở chế độ xám): OCR trên ảnh xám, không cần RGB
+        if self._source == 'pil':
+            return self._cache['pil'].mode in ('L', '1')
+        return self._source == 'gray'
+
+    @property
+    def size(self):
+        if self._source == 'pil':
+            return self._cache['pil'].size
+        height, width = self._cache[self._source].shape[:2]
+        return width, height
+
+    def downscaled(self, scale):
+        scaled = self._get('downscaled', dict)
+        if scale not in scaled:
+            scaled[scale] = cv2.resize(self.analysis, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return scaled[scale]
+
+    def crop(self, bbox):
+        # View (không sao chép) của vùng (x, y, w, h) trên ảnh RGB
+        x, y, w, h = bbox
+        return self.rgb[y:y + h, x:x + w]
+
+    def release(self, *names):
+        # Giải phóng các biểu diễn không còn cần, trừ ảnh gốc (view đang được giữ ở nơi khác vẫn còn hiệu lực)
+        for name in names:
+            if name != self._source:
+                self._cache.pop(name, None)
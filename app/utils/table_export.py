@@ -0,0 +1,48 @@
+import csv
+import io
+
+
+def table_grid(cells, num_rows=None, num_cols=None):
+    """
+    Dựng lưới text hàng x cột từ các ô (dict có row/col hoặc position, row_span, col_span, text).
+    Ô gộp chỉ ghi text vào vị trí trên-trái, các vị trí còn lại để trống.
+    """
+    slots = []
+    for cell in cells:
+        row, col = cell['position'] if 'position' in cell else (cell['row'], cell['col'])
+        slots.append((row, col, cell.get('row_span') or 1, cell.get('col_span') or 1, cell.get('text') or ''))
+
+    if num_rows is None:
+        num_rows = max((row + row_span for row, _, row_span, _, _ in slots), default=0)
+    if num_cols is None:
+        num_cols = max((col + col_span for _, col, _, col_span, _ in slots), default=0)
+
+    grid = [[''] * num_cols for _ in range(num_rows)]
+    for row, col, _, _, text in slots:
+        if row < num_rows and col < num_cols:
+            grid[row][col] = text
+    return grid
+
+
+def table_to_csv(grid) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(grid)
+    return buffer.getvalue()
+
+
+def table_to_json(cells, grid) -> dict:
+    return {
+        'num_rows': len(grid),
+        'num_cols': len(grid[0]) if grid else 0,
+        'rows': grid,
+        'cells': [
+            {
+                'row': cell['position'][0] if 'position' in cell else cell['row'],
+                'col': cell['position'][1] if 'position' in cell else cell['col'],
+                'row_span': cell.get('row_span') or 1,
+                'col_span': cell.get('col_span') or 1,
+                'text': cell.get('text') or ''
+            }
+            for cell in cells
+        ]
+    }
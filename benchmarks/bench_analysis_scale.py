@@ -0,0 +1,132 @@
+"""
+Thời gian phân tích bố cục một trang (tiền xử lý, tìm vùng văn bản, dò bảng) theo tỷ lệ
+analysis.scale, kèm độ phủ (recall) của vùng văn bản và ô bảng so với đáp án của trang tổng hợp:
+một khối/ô đáp án được tính là tìm thấy nếu có vùng/ô phát hiện được với IoU >= --iou.
+
+Trang gồm nhiều khối văn bản ngăn bởi đường kẻ ngang chạy hết khổ giấy (mỗi khối là một vùng
+liên thông riêng với find_text_regions) và một bảng kẻ ô trong một khối.
+
+    python benchmarks/bench_analysis_scale.py --scales 1 0.75 0.5 0.33 --pages 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.image_preprocessing_service import ImagePreprocessor
+from app.services.region_segmentation_service import RegionSegmenter
+from app.services.table_detector_service import TableDetector
+from app.utils.page_image import PageImage
+
+from bench_table_intersections import PAGE_SHAPE
+
+
+def make_page(rng, margin=150):
+    """
+    Trả về (ảnh, các khối văn bản, các ô bảng) với khối/ô dạng (x1, y1, x2, y2).
+    """
+    height, width = PAGE_SHAPE
+    page = np.full((height, width, 3), 250, dtype=np.uint8)
+
+    # Đường kẻ ngang hết khổ chia trang thành các khối cao 300-600 px
+    rules = [0]
+    while rules[-1] + 900 < height:
+        rules.append(rules[-1] + int(rng.integers(300, 600)))
+    rules.append(height)
+    blocks = []
+    for top, bottom in zip(rules[:-1], rules[1:]):
+        thickness = int(rng.integers(3, 7)) if bottom < height else 0
+        if thickness:
+            page[bottom - thickness:bottom] = 0
+        blocks.append((0, top, width, bottom - thickness))
+
+    # Bảng kẻ ô trong khối cao nhất, các khối còn lại là chữ
+    table_block = max(range(len(blocks)), key=lambda i: blocks[i][3] - blocks[i][1])
+    cells = []
+    for index, (_, top, _, bottom) in enumerate(blocks):
+        if index == table_block:
+            ys = np.linspace(top + 40, bottom - 40, int(rng.integers(3, 6))).astype(int)
+            xs = np.linspace(margin, width - margin, int(rng.integers(3, 7))).astype(int)
+            for y in ys:
+                cv2.line(page, (xs[0], y), (xs[-1], y), (0, 0, 0), 3)
+            for x in xs:
+                cv2.line(page, (x, ys[0]), (x, ys[-1]), (0, 0, 0), 3)
+            cells += [(x1, y1, x2, y2) for y1, y2 in zip(ys[:-1], ys[1:]) for x1, x2 in zip(xs[:-1], xs[1:])]
+            continue
+        for y in range(top + 80, bottom - 40, 60):
+            x = margin
+            while x < width - 400:
+                word = int(rng.integers(2, 8))
+                cv2.putText(page, 'a' * word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (30, 30, 30), 3)
+                x += word * 26 + 30
+    return Image.fromarray(page), blocks, cells
+
+
+def iou(a, b):
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    inter = max(0, min(ax2, bx2) - max(ax1, bx1)) * max(0, min(ay2, by2) - max(ay1, by1))
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter
+    return inter / union if union else 0.0
+
+
+def recall(reference, found, threshold):
+    if not reference:
+        return 1.0
+    return sum(any(iou(ref, box) >= threshold for box in found) for ref in reference) / len(reference)
+
+
+def analyse(preprocessor, segmenter, detector, image, scale):
+    start = time.perf_counter()
+    page = PageImage(image, scale)
+    preprocessor.preprocess(page)
+    tables = detector.detect_tables(page)
+    regions = segmenter.find_text_regions(page)
+    elapsed = time.perf_counter() - start
+    boxes = [(x, y, x + w, y + h) for x, y, w, h in regions]
+    cells = [cell['bbox'] for table in tables for cell in table['cells']]
+    return elapsed, boxes, cells
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0, 0.75, 0.5, 0.33])
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--iou', type=float, default=0.5)
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+    preprocessor = ImagePreprocessor(config)
+    segmenter = RegionSegmenter(config)
+    detector = TableDetector(config)
+
+    rng = np.random.default_rng(0)
+    pages = [make_page(rng) for _ in range(args.pages)]
+    num_blocks = sum(len(blocks) for _, blocks, _ in pages)
+    num_ref_cells = sum(len(cells) for _, _, cells in pages)
+    print(f"{args.pages} trang, {num_blocks} khối văn bản, {num_ref_cells} ô bảng (đáp án)")
+
+    print(f"{'scale':>6} {'s/trang':>8} {'vùng':>6} {'recall vùng':>12} {'ô':>5} {'recall ô':>9}")
+    for scale in args.scales:
+        times, region_recall, cell_recall, num_regions, num_cells = [], [], [], 0, 0
+        for image, ref_blocks, ref_cells in pages:
+            elapsed, boxes, cells = analyse(preprocessor, segmenter, detector, image, scale)
+            times.append(elapsed)
+            region_recall.append(recall(ref_blocks, boxes, args.iou))
+            cell_recall.append(recall(ref_cells, cells, args.iou))
+            num_regions += len(boxes)
+            num_cells += len(cells)
+        print(f"{scale:>6.2f} {np.mean(times):8.3f} {num_regions:>6} {np.mean(region_recall):12.3f} "
+              f"{num_cells:>5} {np.mean(cell_recall):9.3f}")
+
+
+if __name__ == '__main__':
+    main()
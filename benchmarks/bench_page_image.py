@@ -0,0 +1,95 @@
+"""
+So sánh bộ nhớ cấp phát (tracemalloc) và thời gian xử lý bố cục một trang A4 300 DPI giữa
+cách cũ (mỗi bước tự chuyển PIL -> numpy -> BGR -> xám, cắt vùng thành ảnh PIL) và PageImage
+(mỗi biểu diễn tính một lần, vùng là view trên mảng RGB của trang).
+
+    python benchmarks/bench_page_image.py --repeat 3
+
+tracemalloc theo dõi được mảng numpy/OpenCV nhưng không thấy bộ nhớ nội bộ của PIL,
+nên số liệu của cách cũ (ảnh crop PIL) là cận dưới.
+Cột "còn giữ" của PageImage gồm các biểu diễn được cache cho đến khi gọi release().
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.image_preprocessing_service import ImagePreprocessor
+from app.services.region_segmentation_service import RegionSegmenter
+from app.services.table_detector_service import TableDetector
+from app.utils.page_image import PageImage
+
+from bench_table_intersections import PAGE_SHAPE
+
+
+def make_page():
+    # Trang màu có chữ và một bảng nhỏ
+    height, width = PAGE_SHAPE
+    page = np.full((height, width, 3), 245, dtype=np.uint8)
+    for y in range(200, 2000, 60):
+        cv2.putText(page, 'Van ban phap luat ' * 4, (150, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 3)
+    for y in np.linspace(2200, 3300, 6).astype(int):
+        cv2.line(page, (150, y), (2330, y), (0, 0, 0), 3)
+    for x in np.linspace(150, 2330, 5).astype(int):
+        cv2.line(page, (x, 2200), (x, 3300), (0, 0, 0), 3)
+    return Image.fromarray(page)
+
+
+def legacy_pipeline(preprocessor, detector, segmenter, image):
+    # Mỗi bước tự chuyển đổi ảnh như trước khi có PageImage
+    bgr = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+    binary = preprocessor.preprocess(bgr)
+    tables = detector.detect_tables(binary)
+    regions = segmenter.find_text_regions(binary)
+    crops = segmenter.extract_regions(image, regions)
+    return tables, crops
+
+
+def page_image_pipeline(preprocessor, detector, segmenter, image):
+    page = PageImage(image)
+    preprocessor.preprocess(page)
+    tables = detector.detect_tables(page)
+    regions = segmenter.find_text_regions(page)
+    crops = segmenter.extract_regions(page, regions)
+    return tables, crops
+
+
+def measure(pipeline, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables, crops = pipeline(*args)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current, peak, len(tables), len(crops)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+    preprocessor = ImagePreprocessor(config)
+    detector = TableDetector(config)
+    segmenter = RegionSegmenter(config)
+    image = make_page()
+
+    print(f"{'cách':<12} {'thời gian (s)':>14} {'còn giữ (MB)':>13} {'đỉnh (MB)':>10} {'bảng':>5} {'vùng':>5}")
+    for name, pipeline in (('cũ', legacy_pipeline), ('PageImage', page_image_pipeline)):
+        for _ in range(args.repeat):
+            elapsed, current, peak, num_tables, num_crops = measure(pipeline, preprocessor, detector, segmenter, image)
+            print(f"{name:<12} {elapsed:14.3f} {current / 2**20:13.1f} {peak / 2**20:10.1f} {num_tables:>5} {num_crops:>5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+So sánh thời gian tìm điểm giao của TableDetector (gom cụm vector hóa) với cách cũ
+(duyệt từng pixel và từng cụm) trên bảng kẻ ô tổng hợp, trang A4 300 DPI, kèm thời gian
+detect_tables đầy đủ và số ô trả về.
+
+    python benchmarks/bench_table_intersections.py --sizes 5 10 20 40
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.table_detector_service import TableDetector
+
+PAGE_SHAPE = (3508, 2480)
+
+
+def make_grid_page(rows, cols, line_width=3, margin=150):
+    page = np.full(PAGE_SHAPE, 255, dtype=np.uint8)
+    height, width = PAGE_SHAPE
+    ys = np.linspace(margin, height - margin, rows + 1).astype(int)
+    xs = np.linspace(margin, width - margin, cols + 1).astype(int)
+    for y in ys:
+        cv2.line(page, (xs[0], y), (xs[-1], y), 0, line_width)
+    for x in xs:
+        cv2.line(page, (x, ys[0]), (x, ys[-1]), 0, line_width)
+    return page
+
+
+def legacy_find_intersections(h_lines, v_lines, threshold):
+    # Cài đặt trước đây, giữ lại để so sánh
+    joints = cv2.bitwise_and(h_lines, v_lines)
+    coords = np.column_stack(np.where(joints > 0))
+    intersections = []
+    for coord in coords:
+        added = False
+        for i, point in enumerate(intersections):
+            if np.linalg.norm(coord - point) < threshold:
+                intersections[i] = (intersections[i] + coord) / 2
+                added = True
+                break
+        if not added:
+            intersections.append(coord)
+    return np.array(intersections)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 10, 20, 40])
+    parser.add_argument('--skip-legacy-above', type=int, default=20,
+                        help="Bỏ qua cách cũ với bảng lớn hơn (rất chậm)")
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+    detector = TableDetector(config)
+    threshold = config['table_detection']['intersection_threshold']
+
+    print(f"{'bảng':>9} {'giao điểm':>10} {'mới (s)':>10} {'cũ (s)':>10} {'cũ (điểm)':>10} {'ô':>6} {'detect (s)':>11}")
+    for size in args.sizes:
+        page = make_grid_page(size, size)
+        h_lines, v_lines = detector._detect_lines(page)
+        tables, detect_time = timed(detector.detect_tables, page)
+        num_cells = sum(len(table['cells']) for table in tables)
+
+        points, new_time = timed(detector._find_intersections, h_lines, v_lines)
+        if size <= args.skip_legacy_above:
+            legacy_points, legacy_time = timed(legacy_find_intersections, h_lines, v_lines, threshold)
+            legacy = f"{legacy_time:10.3f} {len(legacy_points):>10}"
+        else:
+            legacy = f"{'-':>10} {'-':>10}"
+        print(f"{size:>4}x{size:<4} {len(points):>10} {new_time:10.4f} {legacy} {num_cells:>6} {detect_time:11.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Đo hiệu quả bước dò nhanh của TableDetector: chạy detect_tables trên các trang chỉ có chữ
+và trang có bảng kẻ ô (A4 300 DPI tổng hợp), có và không có dò nhanh, in số trang bị bỏ qua
+và thời gian tiết kiệm từng bước.
+
+    python benchmarks/bench_table_probe.py --text-pages 20 --table-pages 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.table_detector_service import TableDetector
+
+from bench_table_intersections import PAGE_SHAPE, make_grid_page
+
+
+def make_text_page(rng, margin=150, line_height=60):
+    # Các dòng chữ giả: từ là các khối mực ngắn, thỉnh thoảng có gạch chân
+    page = np.full(PAGE_SHAPE, 255, dtype=np.uint8)
+    height, width = PAGE_SHAPE
+    for y in range(margin, height - margin, line_height):
+        x = margin
+        while x < width - margin - 100:
+            word = int(rng.integers(40, 180))
+            cv2.putText(page, 'x' * (word // 25), (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 3)
+            x += word + int(rng.integers(20, 40))
+        if rng.random() < 0.05:
+            cv2.line(page, (margin, y + 10), (width // 2, y + 10), 0, 2)
+    return page
+
+
+def run(detector, pages):
+    detector.reset_stats()
+    start = time.perf_counter()
+    num_tables = sum(len(detector.detect_tables(page)) for page in pages)
+    return num_tables, time.perf_counter() - start, detector.stats_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--text-pages', type=int, default=20)
+    parser.add_argument('--table-pages', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+
+    rng = np.random.default_rng(0)
+    pages = [make_text_page(rng) for _ in range(args.text_pages)]
+    pages += [make_grid_page(size, size) for size in rng.integers(3, 20, args.table_pages)]
+
+    for enabled in (False, True):
+        config['table_probe'] = dict(config.get('table_probe', {}), enabled=enabled)
+        detector = TableDetector(config)
+        num_tables, elapsed, summary = run(detector, pages)
+        print(f"dò nhanh={'bật' if enabled else 'tắt'}: {len(pages)} trang, {num_tables} bảng, {elapsed:.3f}s, "
+              f"bỏ qua {summary['skipped']} trang (dò nhanh {summary['probe_time']:.3f}s)")
+        for stage, stage_time in summary['stage_time'].items():
+            print(f"    {stage:<14} {stage_time:8.3f}s  tiết kiệm ước tính {summary['saved_time'][stage]:8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Xuất văn bản ra NDJSON/CSV/Parquet, dùng chung bộ lọc và bộ mã hóa với GET /api/v1/documents/export.
+
+    python export_documents.py --format parquet --output documents.parquet --document-type "CÔNG VĂN"
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+from app.db.base import AsyncSessionLocal, async_engine
+from app.schemas.documents import DocumentFilter
+from app.services.document_service import DocumentService
+from app.utils.export_encoders import EXPORT_FORMATS
+
+
+async def run(args):
+    service = DocumentService()
+    encoder = service.create_export_encoder(
+        args.format,
+        [f.strip() for f in args.fields.split(',') if f.strip()] if args.fields else None
+    )
+    filters = DocumentFilter(
+        document_type=args.document_type,
+        document_number=args.document_number,
+        issuing_agency=args.issuing_agency,
+        signer=args.signer,
+        issue_date_from=args.issue_date_from,
+        issue_date_to=args.issue_date_to
+    )
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        async for chunk in service.export_documents(AsyncSessionLocal, filters, encoder, args.batch_size):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Xuất văn bản đã lưu")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+    parser.add_argument('--output', help="File đích, mặc định ghi ra stdout")
+    parser.add_argument('--fields', help="Danh sách cột, phân tách bằng dấu phẩy")
+    parser.add_argument('--batch-size', type=int, default=DocumentService.EXPORT_BATCH_SIZE)
+    parser.add_argument('--document-type')
+    parser.add_argument('--document-number')
+    parser.add_argument('--issuing-agency')
+    parser.add_argument('--signer')
+    parser.add_argument('--issue-date-from', type=date.fromisoformat)
+    parser.add_argument('--issue-date-to', type=date.fromisoformat)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()